@@ -0,0 +1,278 @@
+#################### bench.py ####################
+# Benchmark suite for LPWA network simulation
+# Note: This program needs "settings.py", "network_mod.py", "trace_mod.py", "trial_mod.py",
+#       "topology_mod.py", "runner_mod.py", and "failure_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ######## ####################
+#
+# 使い方:
+#   python bench.py                              # 全ノード数で計測して bench_result.json に保存
+#   python bench.py --sizes 60 1000 -o new.json  # ノード数を指定
+#   python bench.py --compare old.json           # 以前の結果と比較(悪化があれば終了コード1)
+#   python bench.py --repeat 5                   # 繰り返し回数を指定(中央値を比較に使う)
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import datetime
+import statistics
+import subprocess
+import tracemalloc
+import concurrent.futures
+import settings as st
+import network_mod as nm
+import trace_mod as tr
+import trial_mod as tl
+import topology_mod as tp
+import runner_mod as rn
+import failure_mod as fl
+try:
+  import resource   # 最大常駐メモリの取得(Unix系のみ)
+except ImportError:
+  resource = None
+
+# 計測するノード数
+SIZES = [60, 1000, 10000, 100000]
+# トポロジーと乱数の固定シード
+SEED = 20261017
+# ノード密度[ノード数/km^2](全ノードがルートノードとつながる程度に密にする)
+DENSITY = 0.15
+# 計測時の設定(深さの上限は大規模なネットワークでも全ノードに届くように緩める)
+CONFIG = {"DEPTH_LIM": 1000}
+# 結果ファイル名
+BENCH_FILE = "bench_result.json"
+# 比較で悪化とみなす割合(0.25: 25%)
+# (同じコードでも実行するプロセスごとに中央値が15%程度ばらつくため，それを超える悪化のみを検出する．
+#  静かな計算機では --tolerance で狭められる)
+TOLERANCE = 0.25
+# 時間の計測の繰り返し回数(ノード数ごとに中央値を結果とする．実行ごとのばらつきを抑える)
+REPEAT = 5
+# 繰り返しを打ち切る1回の計測時間[s](長い計測は相対的なばらつきが小さいため，大規模なネットワークでは1回とする)
+REPEAT_WALL_LIM = 60
+
+# 比較する指標 (区分, 名前, 雑音の下限)
+# いずれも小さいほど良い．以前の値との差が雑音の下限未満のときは，割合によらず悪化とみなさない
+# (ステップ数は決定的なため，ステップ毎秒は経過時間と同じ情報となり比較しない)
+METRICS = [
+  ("build", "wall", 0.005),       # [s]
+  ("recovery", "wall", 0.005),    # [s]
+  ("memory", "peak", 2 ** 20),    # [byte]
+  ]
+
+
+#################################### 計測区間クラス ####################################
+# with 文の区間の経過時間を計測する．
+# 計測中はガベージコレクションを止め，実行ごとのばらつきを抑える(timeit と同様)．
+class Timer:
+
+  def __enter__(self):
+    gc.collect()
+    self.is_gc_enabled = gc.isenabled()
+    gc.disable()
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc) -> None:
+    self.wall = time.perf_counter() - self.start
+    if self.is_gc_enabled: gc.enable()
+    return
+
+################################## 計測区間クラス終 ##################################
+
+# 一括実行の計測
+# (引数)    ネットワーク
+# (戻り値)  計測結果 {wall, steps, steps_per_sec, time, cnt, packets}
+def measure_run(nodes) -> dict:
+  with Timer() as timer:
+    result = rn.run_until_converged(nodes)
+  wall = timer.wall
+  return {
+    "wall": wall,
+    "steps": result.steps,
+    "steps_per_sec": result.steps / wall if wall > 0 else None,
+    "time": result.time,
+    "cnt": result.cnt,
+    "packets": result.packets,
+    }
+
+# 故障させるノードの選択
+# 子孫ノード数が最大のノード(同数はIDの小さい方)を選び，再構成の影響が最も大きい故障を計測する
+# (子ノードを持つだけのノードでは，子ノードが予備の経路へすぐに切り替わり，再構成がほぼ発生しない)
+# (引数)    ネットワーク(構築済み)
+# (戻り値)  ノード, 子孫ノード数 (候補が無いとき: None, 0)
+def choose_victim(nodes) -> tuple:
+  candidates = [node for node in nodes.created_nodes() if node is not nodes.root and node.is_alive]
+  children = fl.find_children(nodes, candidates)
+  subtrees = {}
+  for node in sorted(candidates, key=lambda node: -node.depth()):   # 深いノードから子孫ノード数を集計
+    subtrees[node.id] = sum(1 + subtrees[child_id] for child_id in children[node.id])
+  victim = min((node for node in candidates if subtrees[node.id] > 0),
+               key=lambda node: (-subtrees[node.id], node.id), default=None)
+  return victim, subtrees[victim.id] if victim is not None else 0
+
+# 1つのノード数の計測(ネットワーク構築 -> ノード故障 -> 再構成)
+# (引数)    ノード数, シード
+# (戻り値)  計測結果
+def bench_size(size: int, seed: int) -> dict:
+  topology = tp.uniform(size, seed, DENSITY)
+  record = {"size": size}
+
+  with Timer() as timer:
+    nodes = tl.make_nodes(topology)
+    nm.sync_nodes(nodes)        # 周囲ノード表の一括構築
+  record["setup"] = {"wall": timer.wall}
+
+  random.seed(seed)
+  nodes.root.build_network()
+  record["build"] = measure_run(nodes)
+
+  victim, subtree = choose_victim(nodes)
+  if victim is None:
+    record["recovery"] = None
+    return record
+  with Timer() as timer:
+    victim.disable(nodes)
+  disable_wall = timer.wall
+  record["recovery"] = measure_run(nodes)
+  record["recovery"]["victim"] = victim.id
+  record["recovery"]["subtree"] = subtree
+  record["recovery"]["disable_wall"] = disable_wall
+  return record
+
+# 最大メモリ使用量の計測(計測のオーバーヘッドがあるため時間の計測とは別に実行)
+# (引数)    ノード数, シード
+# (戻り値)  {peak: 最大確保量[byte], method: "tracemalloc"}
+def bench_memory(size: int, seed: int) -> dict:
+  tracemalloc.start()
+  try:
+    bench_size(size, seed)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return {"peak": peak, "method": "tracemalloc"}
+
+# 繰り返した計測結果の集約
+# 経過時間は中央値を結果とし，最小値を wall_min，全ての値を walls に残す(その他の値は決定的なため1回目の値)
+# ステップ毎秒は中央値の経過時間から求め直す
+# (最小値は偶然速かった1回に引きずられ，以前の結果との比較がかえって不安定になるため中央値で比較する)
+# (引数)    計測結果のリスト(同じノード数とシード)
+# (戻り値)  計測結果
+def merge_records(records: list) -> dict:
+  record = records[0]
+  for group in ("setup", "build", "recovery"):
+    if record[group] is None: continue
+    walls = [r[group]["wall"] for r in records]
+    record[group]["wall"] = statistics.median(walls)
+    record[group]["wall_min"] = min(walls)
+    record[group]["walls"] = walls
+    if "steps_per_sec" in record[group]:
+      wall = record[group]["wall"]
+      record[group]["steps_per_sec"] = record[group]["steps"] / wall if wall > 0 else None
+  if record["recovery"] is not None:
+    record["recovery"]["disable_wall"] = statistics.median(r["recovery"]["disable_wall"] for r in records)
+  return record
+
+# 1つのノード数の計測(子プロセス用)
+# ノード数ごとに新しいプロセスで計測し，最大常駐メモリを他のノード数の計測と分ける
+# (最大常駐メモリを取得できない環境では，tracemalloc で計測し直す)
+# (引数)    (ノード数, シード, 設定, メモリ使用量の計測の有無, 繰り返し回数)
+# (戻り値)  計測結果
+def run_size(args: tuple) -> dict:
+  size, seed, config, is_memory, repeat = args
+  st.apply_config(config)
+  tr.set_level(tr.SILENT)
+  records = []
+  while len(records) < max(1, repeat):
+    records.append(bench_size(size, seed))
+    if records[-1]["build"]["wall"] >= REPEAT_WALL_LIM: break
+  record = merge_records(records)
+  if not is_memory: return record
+  if resource is not None:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    record["memory"] = {"peak": peak, "method": "ru_maxrss"}
+  else:
+    record["memory"] = bench_memory(size, seed)
+  return record
+
+# 実行環境の情報
+def get_meta() -> dict:
+  try:
+    commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    commit = None
+  return {
+    "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    "commit": commit,
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "seed": SEED,
+    "repeat": REPEAT,
+    "density": DENSITY,
+    "config": st.Config(**CONFIG).to_dict(),
+    }
+
+# 指標の値
+def get_metric(record: dict, group: str, name: str):
+  values = record.get(group)
+  return None if values is None else values.get(name)
+
+# 以前の結果との比較
+# 割合が悪化とみなす割合を超え，かつ差が雑音の下限以上のときに悪化とする
+# (引数)    今回の結果, 以前の結果, 悪化とみなす割合
+# (戻り値)  悪化した指標の数
+def compare(results: dict, baseline: dict, tolerance: float) -> int:
+  old_records = {record["size"]: record for record in baseline["results"]}
+  regressions = 0
+  print("[Comparison] (new / old)")
+  for record in results["results"]:
+    old = old_records.get(record["size"])
+    if old is None: continue
+    for group, name, noise_floor in METRICS:
+      new_value, old_value = get_metric(record, group, name), get_metric(old, group, name)
+      if not new_value or not old_value: continue
+      ratio = new_value / old_value
+      is_worse = ratio > 1 + tolerance and new_value - old_value >= noise_floor
+      regressions += is_worse
+      print("size " + str(record["size"]) + " " + group + "." + name + ": " + format(ratio, ".3f")
+            + (" <- regression" if is_worse else ""))
+  return regressions
+
+# ベンチマークの実行
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Benchmark suite for LPWA network simulation")
+  parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="node counts")
+  parser.add_argument("--seed", type=int, default=SEED, help="topology and random seed")
+  parser.add_argument("-o", "--output", default=BENCH_FILE, help="result file (JSON)")
+  parser.add_argument("--compare", help="previous result file to compare with")
+  parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown ratio")
+  parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+  parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per size (the median time is compared)")
+  args = parser.parse_args()
+  SEED = args.seed
+  REPEAT = args.repeat
+
+  results = {"meta": get_meta(), "results": []}
+  for size in args.sizes:
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+      record = executor.submit(run_size, (size, args.seed, st.Config(**CONFIG), not args.no_memory, args.repeat)).result()
+    results["results"].append(record)
+    print("size " + str(size) + ": build " + format(record["build"]["wall"], ".3f") + "s ("
+          + str(record["build"]["steps"]) + " steps, " + format(record["build"]["steps_per_sec"] or 0, ".0f") + " steps/s)"
+          + (", recovery " + format(record["recovery"]["wall"], ".3f") + "s (" + str(record["recovery"]["steps"]) + " steps, subtree "
+             + str(record["recovery"]["subtree"]) + ")" if record["recovery"] else "")
+          + (", peak " + format(record["memory"]["peak"] / 2**20, ".1f") + "MiB" if "memory" in record else ""))
+
+  with open(args.output, "w") as f:
+    json.dump(results, f, indent=2)
+  print("Saved the result to " + args.output + ".")
+
+  if args.compare:
+    with open(args.compare) as f:
+      regressions = compare(results, json.load(f), args.tolerance)
+    if regressions: sys.exit(1)
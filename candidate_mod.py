@@ -0,0 +1,104 @@
+#################### candidate_mod.py ####################
+# Routing candidate table for LPWA network simulation
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ################ ####################
+
+import bisect
+
+
+################################### 経路候補表クラス ###################################
+# 経路(辞書: candidate_id, uplink_id, depth, rssi)を (深さ昇順, RSSI降順) に並べて保持する．
+# 候補ノードIDから経路への辞書と，並び順のキー (深さ, -RSSI, 追加番号, 経路) の整列済みリストで管理し，
+# IDによる検索をO(1)，順位の検索と挿入位置の探索をO(log n)で行う．
+# 深さとRSSIが等しい経路どうしは追加した順に並ぶ(従来の線形探索による挿入と同じ順序)．
+#
+# - 親ノードの経路:           table[0]
+# - バックアップノードの経路:  table[1:]
+class CandidateTable:
+
+  def __init__(self) -> None:
+    self.entries = {}   # 候補ノードID: 並び順のキー
+    self.order = []     # 並び順のキーの整列済みリスト
+    self.seq = 0        # 追加番号(同順位の経路の並び順に使用)
+    return
+
+  def __len__(self) -> int:
+    return len(self.order)
+
+  def __bool__(self) -> bool:
+    return bool(self.order)
+
+  # 順位(またはスライス)による経路の参照
+  def __getitem__(self, i):
+    if isinstance(i, slice): return [entry[-1] for entry in self.order[i]]
+    return self.order[i][-1]
+
+  # 順位の順に経路を参照
+  def __iter__(self):
+    return (entry[-1] for entry in self.order)
+
+  def __contains__(self, id: int) -> bool:
+    return int(id) in self.entries
+
+  def __repr__(self) -> str:
+    return repr(self[:])
+
+  # 経路の順位の探索
+  # (引数)    候補ノードID
+  # (戻り値)  経路の順位, -1: 該当経路なし
+  def search(self, id: int) -> int:
+    entry = self.entries.get(int(id))
+    if entry is None: return -1
+    return bisect.bisect_left(self.order, entry)
+
+  # 経路の挿入
+  # 深さとRSSIが等しい経路があるときは，その後ろに挿入する
+  # (引数)    経路(同じ候補ノードIDの経路が無いこと)
+  # (戻り値)  挿入した順位
+  def insert(self, route: dict) -> int:
+    entry = (route["depth"], -route["rssi"], self.seq, route)
+    self.seq += 1
+    self.entries[int(route["candidate_id"])] = entry
+    i = bisect.bisect_left(self.order, entry)
+    self.order.insert(i, entry)
+    return i
+
+  # 経路の削除
+  # (引数) 候補ノードID
+  # (戻り値)
+  # 1:  親ノード(0番要素)の削除
+  # 0:  削除
+  # -1: 該当経路なし
+  def remove(self, id: int) -> int:
+    entry = self.entries.pop(int(id), None)
+    if entry is None: return -1
+    i = bisect.bisect_left(self.order, entry)
+    del self.order[i]
+    return int(i == 0)
+
+  # 全経路の削除
+  def clear(self) -> None:
+    self.entries.clear()
+    self.order.clear()
+    self.seq = 0
+    return
+
+  # 経路と追加番号の取得(スナップショット用)
+  # (戻り値) [(経路, 追加番号), ...] (順位の順), 次の追加番号
+  def export(self) -> tuple:
+    return [(entry[-1], entry[2]) for entry in self.order], self.seq
+
+  # 経路の一括設定(スナップショットからの復元用)
+  # (引数) [(経路, 追加番号), ...] (順位の順), 次の追加番号
+  def restore(self, routes: list, seq: int) -> None:
+    self.order = [(route["depth"], -route["rssi"], route_seq, route) for route, route_seq in routes]
+    self.entries = {int(entry[-1]["candidate_id"]): entry for entry in self.order}
+    self.seq = seq
+    return
+
+################################# 経路候補表クラス終 ##################################
+
+if __name__ == '__main__':
+  pass
@@ -1,6 +1,8 @@
 ############################## experiment.py ##############################
 # Experiment file for LPWA network simulation
-# Note: This program needs "settings.py", "network_mod.py", and "network_io.py"
+# Note: This program needs "settings.py", "network_mod.py", "network_io.py", "trial_mod.py",
+#       "trace_mod.py", "topology_mod.py", "snapshot_mod.py", "failure_mod.py", "tree_mod.py",
+#       "runner_mod.py", and "profile_mod.py"
 # @created      2024-01-06
 # @developer    226E0214 Seiya Kinoshita
 # @affiliation  Tanaka Lab. Kyutech
@@ -9,17 +11,51 @@
 from settings import *
 from network_mod import *
 from network_io import *
+import sys
 import numpy as np
-import csv
+import trial_mod as tl
+import trace_mod as tr
+import topology_mod as tp
+import snapshot_mod as sn
+import failure_mod as fl
+import tree_mod as tb
+import runner_mod as rn
+import profile_mod as pf
 
 # 実験試行回数
 NUM_OF_TRIAL = 100
+# グラフ描画の有無(False: 描画モジュールを読み込まずに実行．表示環境の無い計算機向け)
+IS_DRAWING = True
+# 並列実行の有無(True: 試行をプロセスプールで並列に実行．グラフ描画は試行前後のみ)
+IS_PARALLEL = False
+# 並列実行時のマスターシード(試行ごとの乱数シードを生成し，結果を再現可能にする)
+MASTER_SEED = 0
+# 収束状態からの分岐の有無(True: ネットワーク構築は初回のみ行い，各試行はその収束状態から復元して始める．
+#                          ノード平均深さと経路平均RSSIは全試行で共通となる)
+IS_FORKING = False
+# 図の保存先ディレクトリ(描画時．保存する図は別スレッドで書き出す)
+FIGURE_DIR = "Figures"
+# 動画ファイル名(None: 図を1枚ずつPNGファイルで保存．例: "Figures/experiment.mp4"．ffmpeg が必要)
+VIDEO_FILE = None
+# 解析的な構築の有無(True: ネットワーク構築を模擬せず，解析的に求めた収束状態から各試行を始める．提案手法のみ．
+#                    復旧の挙動のみを計測するとき向け．tree_mod.py 参照)
+IS_ANALYTIC_BUILD = False
+# トポロジーファイル(.npy, topology_mod.py - save_network で保存．None: 下記のノードリストを使用)
+TOPOLOGY_FILE = None
+# 故障解析の同時故障ノード数(0: 解析しない．1以上: 収束状態から非ルートノードの全ての組を故障させて評価し，
+#                           ノードごとの重要度を出力して終了．反復試行実験は行わない)
+FAILURE_ANALYSIS_K = 0
+# 逐次出力のレベル(trace_mod.py 参照．SILENT: 出力なし, PACKET: ステップごとの送受信パケットまで出力)
+TRACE_LEVEL = tr.PACKET
+# 区間ごとの計測の有無(True: 1ステップの処理と描画の区間ごとの経過時間・呼び出し回数を最後に出力．
+#                      profile_mod.py 参照．並列実行時は子プロセスの試行を含まない)
+IS_PROFILING = False
 # *経路制御アルゴリズムの切り替えは
 # settings.py - is_previous_routing を参照のこと
 
 root = RootNode(0, (0, 0))   # ルートノード
 
-nodes = [
+nodes = Network([
     root,   # ルートノードを1つだけ必ず含める
 
     Node(1, (3, 3)),     Node(2, (4, 6)),     Node(3, (6, 2)),
@@ -44,121 +80,153 @@ nodes = [
     Node(52, (15, 2)),   Node(53, (-10, -13)), Node(54, (-7, 0)),
     Node(55, (-10, 9)),  Node(56, (9, 2)),     Node(57, (2, -10)),
     Node(58, (-6, 10)),  Node(59, (-14, 7)),   Node(60, (6, -14))
-]
-
-step = 0  # ステップ数
-time = 0  # 経過予想時間
-cnt = 0   # 通信回数
-
-# 初期ネットワークの確認
-print("Hello, network!")
-fig, ax = nio.init_graph()
-nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True)
-wait_command(nodes, step, time, cnt, fig, ax)
-
-ave_depths = [] # ノード平均深さリスト
-ave_rssis = []  # 経路平均RSSIリスト
-times = []      # 復旧経過時間リスト
-cnts = []       # 復旧通信回数リスト
-
-# 反復試行実験
-for i in range(NUM_OF_TRIAL):
-    # ネットワーク構築
-    step += 1
-    root.build_network()
-    res = 0
-    while res != -1:
-        step += 1
-        print("\n========================= Step: " + str(step) + " =========================")
-        res, time, cnt = root.update_network(nodes, time, cnt)
+])
+
+# トポロジーファイルを指定したときはファイルから読み込む(ノードは参照されたときに作成)
+if TOPOLOGY_FILE:
+    nodes = tp.load_network(TOPOLOGY_FILE)
+    root = nodes.root
+
+# 実験の実行(並列実行時に子プロセスで再実行されないように)
+if __name__ == "__main__":
+    step = 0  # ステップ数
+    time = 0  # 経過予想時間
+    cnt = 0   # 通信回数
+
+    # 更新処理が終了するまでネットワークを更新(ステップ数は通算)
+    def run(time: int, cnt: int) -> tuple:
+        result = rn.run_until_converged(nodes, step, time, cnt)
+        return result.step, result.time, result.cnt
+
+    # グラフの更新(描画しないときはスキップ)
+    def draw(is_save = False) -> None:
+        if not IS_DRAWING: return
+        nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True, is_save=is_save)
+
+    # 初期ネットワークの確認
+    tr.set_level(TRACE_LEVEL)
+    if IS_PROFILING: pf.enable()
+    print("Hello, network!")
+    fig, ax = nio.init_graph() if IS_DRAWING else (None, None)
+    if IS_DRAWING: nio.open_frame_writer(FIGURE_DIR, VIDEO_FILE)
+    draw()
+    if IS_DRAWING: wait_command(nodes, step, time, cnt, fig, ax)
+
+    # 故障解析(並列実行)
+    if FAILURE_ANALYSIS_K:
+        analysis = fl.run_failure_analysis(tl.get_topology(nodes), FAILURE_ANALYSIS_K, MASTER_SEED,
+                                           is_analytic=IS_ANALYTIC_BUILD)
+        criticality = analysis.criticality()
+        print("[Failure analysis (" + str(len(analysis.results)) + " combinations of " + str(FAILURE_ANALYSIS_K) + " nodes)]")
+        for rank, id, depth, children, subtree, time, cnt, orphaned, _ in criticality[:10]:
+            print("No." + str(rank) + ": Node " + str(id) + " (depth = " + str(depth) + ", subtree = " + str(subtree)
+                  + "): time = " + str(time) + ", cnt = " + str(cnt) + ", orphaned = " + str(orphaned))
+        fl.save_combinations("Experiment/failure_combinations_k" + str(FAILURE_ANALYSIS_K) + ".csv", analysis)
+        fl.save_criticality("Experiment/failure_criticality_k" + str(FAILURE_ANALYSIS_K) + ".csv", analysis)
+        print("Saved the result.")
+        print("Good bye!")
+        sys.exit()
+
+    ave_depths = [] # ノード平均深さリスト
+    ave_rssis = []  # 経路平均RSSIリスト
+    times = []      # 復旧経過時間リスト
+    cnts = []       # 復旧通信回数リスト
+
+    # 反復試行実験(並列実行)
+    # 各試行はトポロジーの複製と試行ごとの乱数シードで独立に実行
+    if IS_PARALLEL:
+        results = tl.run_trials(tl.get_topology(nodes), NUM_OF_TRIAL, MASTER_SEED,
+                                is_forking=IS_FORKING, is_analytic=IS_ANALYTIC_BUILD)
+        for i, (ave_depth, ave_rssi, time, cnt) in enumerate(results):
+            ave_depths.append(ave_depth)
+            ave_rssis.append(ave_rssi)
+            times.append(time)
+            cnts.append(cnt)
+            print("No." + str(i) + ": ave_depth = " + str(ave_depth) + ", ave_rssi = " + str(ave_rssi)
+                  + ", time = " + str(time) + ", cnt = " + str(cnt))
+
+    # 反復試行実験(逐次実行)
+    else:
+        baseline = tb.build_tree(nodes) if IS_ANALYTIC_BUILD else None  # 収束状態のスナップショット(分岐するとき)
+        for i in range(NUM_OF_TRIAL):
+            # ネットワーク構築(分岐するときは2回目以降はスナップショットから復元)
+            if baseline is not None:
+                sn.restore_snapshot(nodes, baseline)
+            else:
+                step += 1
+                root.build_network()
+                step, time, cnt = run(time, cnt)
+                if IS_FORKING: baseline = sn.take_snapshot(nodes)
     
-    # ノード平均深さと経路平均RSSIの出力
-    ave_depth = np.mean([node.depth() for node in nodes[1:]])
-    ave_rssi = np.mean([node.uplink_rssi() for node in nodes[1:]])
-    ave_depths.append(ave_depth)
-    ave_rssis.append(ave_rssi)
-    print("No." + str(i) + ": ave_depth = " + str(ave_depth) + ", ave_rssi = " + str(ave_rssi))
-    nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True, is_save=True) # グラフの更新
-
-    # ノード故障
-    unable_node = random.choice(nodes[1:])  # 非ルートノードを1つ選択
-    unable_node.disable(nodes)
-    print("Node " + str(unable_node.id) + " is disabled.")
-    nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True) # グラフの更新
-
-    # ネットワーク再構成
-    # 現状手法
-    if is_previous_rouing:
-        root.init_network()
-        res = 0
-        while res != -1:
-            step += 1
-            print("\n========================= Step: " + str(step) + " =========================")
-            res, time, cnt = root.update_network(nodes, time, cnt)
+            # ノード平均深さと経路平均RSSIの出力
+            ave_depth = np.mean([node.depth() for node in nodes[1:]])
+            ave_rssi = np.mean([node.uplink_rssi() for node in nodes[1:]])
+            ave_depths.append(ave_depth)
+            ave_rssis.append(ave_rssi)
+            print("No." + str(i) + ": ave_depth = " + str(ave_depth) + ", ave_rssi = " + str(ave_rssi))
+            draw(is_save=True) # グラフの更新
+
+            # ノード故障
+            unable_node = random.choice(nodes[1:])  # 非ルートノードを1つ選択
+            unable_node.disable(nodes)
+            print("Node " + str(unable_node.id) + " is disabled.")
+            draw() # グラフの更新
+
+            # ネットワーク再構成
+            # 現状手法
+            if is_previous_rouing:
+                root.init_network()
+                step, time, cnt = run(time, cnt)
         
-        time ,cnt = 0, 0    # 計測開始
-        root.build_network()
-        res = 0
-        while res != -1:
-            step += 1
-            print("\n========================= Step: " + str(step) + " =========================")
-            res, time, cnt = root.update_network(nodes, time, cnt)
+                time ,cnt = 0, 0    # 計測開始
+                root.build_network()
+                step, time, cnt = run(time, cnt)
         
-    # 提案手法
+            # 提案手法
+            else:
+                time ,cnt = 0, 0    # 計測開始
+                step, time, cnt = run(time, cnt)
+
+            # 復旧経過時間と復旧通信回数の出力
+            times.append(time)
+            cnts.append(cnt)
+            print("No." + str(i) + ": time = " + str(time) + ", cnt = " + str(cnt))
+            draw(is_save=True) # グラフの更新
+
+            # ノード復帰
+            enable_node = nodes.get(unable_node.id)
+            enable_node.enable()
+            draw() # グラフの更新
+
+            # ネットワーク初期化(分岐するときは次の試行で復元するため不要)
+            if IS_FORKING or IS_ANALYTIC_BUILD: continue
+            root.init_network()
+            step, time, cnt = run(time, cnt)
+            draw() # グラフの更新
+
+
+    # 結果の表示
+    if is_previous_rouing: 
+        print("\\********** Previous Routing **********")
+    else:
+        print("\\********** Proposed Routing **********")
+    print("[Result (" + str(NUM_OF_TRIAL) + "-trial average)]")
+    print("Average node depth: " + str(np.mean(ave_depths)))
+    print("Average route RSSI: " + str(np.mean(ave_rssis)) + "[dBm]")
+    print("Recovery elapsed time: " + str(np.mean(times)) + "[ms]")
+    print("Recovery com count: " + str(np.mean(cnts)))
+    if IS_PROFILING: pf.summary()
+    if IS_DRAWING:
+        nio.close_frame_writer()    # 書き出し待ちの図をすべて保存
+        wait_command(nodes, step, time, cnt, fig, ax)
+
+    # CSVファイルに結果を出力
+    result = [[ave_depths[i], ave_rssis[i], times[i], cnts[i]] for i in range(NUM_OF_TRIAL)]
+
+    if is_previous_rouing: 
+        tl.save_results("Experiment/result_previous_routing.csv", result)
     else:
-        time ,cnt = 0, 0    # 計測開始
-        res = 0
-        while res != -1:
-            step += 1
-            print("\n========================= Step: " + str(step) + " =========================")
-            res, time, cnt = root.update_network(nodes, time, cnt)
-
-    # 復旧経過時間と復旧通信回数の出力
-    times.append(time)
-    cnts.append(cnt)
-    print("No." + str(i) + ": time = " + str(time) + ", cnt = " + str(cnt))
-    nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True, is_save=True) # グラフの更新
-
-    # ノード復帰
-    enable_node = nm.search_node(nodes, unable_node.id)
-    enable_node.enable()
-    nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True) # グラフの更新
-
-    # ネットワーク初期化
-    root.init_network()
-    res = 0
-    while res != -1:
-        step += 1
-        print("\n========================= Step: " + str(step) + " =========================")
-        res, time, cnt = root.update_network(nodes, time, cnt)
-    nio.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis=True) # グラフの更新
-
-
-# 結果の表示
-if is_previous_rouing: 
-    print("\\********** Previous Routing **********")
-else:
-    print("\\********** Proposed Routing **********")
-print("[Result (" + str(NUM_OF_TRIAL) + "-trial average)]")
-print("Average node depth: " + str(np.mean(ave_depths)))
-print("Average route RSSI: " + str(np.mean(ave_rssis)) + "[dBm]")
-print("Recovery elapsed time: " + str(np.mean(times)) + "[ms]")
-print("Recovery com count: " + str(np.mean(cnts)))
-wait_command(nodes, step, time, cnt, fig, ax)
-
-# CSVファイルに結果を出力
-result = [["ave_depth", "ave_rssi", "time", "cnt"]]
-for i in range(NUM_OF_TRIAL):
-    result.append([ave_depths[i], ave_rssis[i], times[i], cnts[i]])
-
-if is_previous_rouing: 
-    with open("Experiment/result_previous_routing.csv", "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(result)
-else:
-    with open("Experiment/result_proposed_routing.csv", "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(result)
-print("Saved the result.")
-
-print("Good bye!")
\ No newline at end of file
+        tl.save_results("Experiment/result_proposed_routing.csv", result)
+    print("Saved the result.")
+
+    print("Good bye!")
\ No newline at end of file
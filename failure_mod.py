@@ -0,0 +1,159 @@
+#################### failure_mod.py ####################
+# Exhaustive node failure analysis for LPWA network simulation
+# Note: This program needs "settings.py", "network_mod.py", "trace_mod.py", "trial_mod.py",
+#       and "snapshot_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############## ####################
+
+import os
+import csv
+import random
+import itertools
+import statistics
+import concurrent.futures
+import settings as st
+import network_mod as nm
+import trace_mod as tr
+import trial_mod as tl
+import snapshot_mod as sn
+
+# 故障の組ごとの結果CSVファイルの列
+COMBINATION_HEADER = ["failed_ids", "time", "cnt", "orphaned"]
+# ノードごとの重要度CSVファイルの列
+CRITICALITY_HEADER = ["rank", "id", "depth", "children", "subtree", "time", "cnt", "orphaned", "combinations"]
+
+
+#################################### 故障解析結果クラス ####################################
+# 1つの収束状態(基準)から，非ルートノードの全ての組(k個ずつ)を故障させたときの再構成の結果を保持する．
+# 各組の評価は基準のスナップショットから復元して同じ乱数シードで行うため，組どうしで結果を比較できる．
+#
+# - 組ごとの結果:     (故障ノードIDのタプル, 復旧経過時間, 復旧通信回数, 孤立ノード数)
+# - 孤立ノード数:     基準の経路木で故障ノードの子孫にあたるノード数(故障ノード自身を除く)
+class FailureAnalysis:
+
+  def __init__(self, k: int) -> None:
+    self.k = k              # 同時に故障させるノード数
+    self.depths = {}        # ノードID: 基準の深さ
+    self.children = {}      # ノードID: 基準の子ノードIDのリスト
+    self.subtrees = {}      # ノードID: 基準の子孫ノード数
+    self.results = []       # 組ごとの結果 [(故障ノードID, time, cnt, orphaned), ...] (組の順)
+    return
+
+  # ノードごとの重要度
+  # 各ノードを含む組の平均の復旧経過時間・復旧通信回数・孤立ノード数で並べる(いずれも降順．k=1では単独故障の結果)
+  # (戻り値) [(順位, ID, 深さ, 子ノード数, 子孫ノード数, time, cnt, orphaned, 組数), ...] (順位の順)
+  def criticality(self) -> list:
+    per_node = {}
+    for failed_ids, time, cnt, orphaned in self.results:
+      for id in failed_ids:
+        per_node.setdefault(id, []).append((time, cnt, orphaned))
+
+    rows = []
+    for id, values in per_node.items():
+      time, cnt, orphaned = (statistics.fmean(column) for column in zip(*values))
+      rows.append((id, self.depths[id], len(self.children[id]), self.subtrees[id], time, cnt, orphaned, len(values)))
+    rows.sort(key=lambda row: (-row[4], -row[5], -row[6], row[0]))
+    return [(rank + 1,) + row for rank, row in enumerate(rows)]
+
+################################## 故障解析結果クラス終 ##################################
+
+
+# 基準の経路木の子ノードの探索
+# (引数)    ネットワーク(構築済み), 故障候補のノード
+# (戻り値)  ノードID: 子ノードIDのリスト
+def find_children(nodes: nm.Network, candidates: list) -> dict:
+  children = {node.id: [] for node in candidates}
+  for node in candidates:
+    uplink_id = node.uplink_id()
+    if uplink_id in children: children[uplink_id].append(node.id)
+  return children
+
+# 孤立ノード数の計算
+# (引数)    ノードID: 子ノードIDのリスト, 故障ノードID
+# (戻り値)  故障ノードのいずれかの子孫にあたるノード数(故障ノード自身を除く)
+def count_orphaned(children: dict, failed_ids: tuple) -> int:
+  failed = set(failed_ids)
+  seen = set()
+  stack = list(failed_ids)
+  while stack:
+    for child_id in children[stack.pop()]:
+      if child_id in seen or child_id in failed: continue
+      seen.add(child_id)
+      stack.append(child_id)
+  return len(seen)
+
+# 故障の組の評価(並列実行用)
+# ネットワークは作業単位ごとに1度だけ作成し，組ごとに基準のスナップショットから復元して評価する
+# (引数)    (トポロジー, スナップショット, 故障ノード番号の組のリスト, 乱数シード, 設定)
+# (戻り値)  組ごとの (復旧経過時間, 復旧通信回数) のリスト
+def evaluate(args: tuple) -> list:
+  topology, snapshot, combinations, seed, config = args
+  st.apply_config(config)   # 子プロセスに親プロセスの設定値を反映
+  nodes = tl.make_nodes(topology)
+  results = []
+  with tr.quiet():
+    for indices in combinations:
+      sn.restore_snapshot(nodes, snapshot)
+      random.seed(seed)
+      results.append(tl.run_failure(nodes, [nodes[index] for index in indices]))
+  return results
+
+# 故障解析の実行
+# マスターシードで1度だけ構築した収束状態を基準とし，非ルートノードのk個の全ての組を故障させて再構成する
+# 組は作業単位にまとめてプロセスプールで並列に評価し，結果は組の順に並べる
+# (引数)    トポロジー, 同時に故障させるノード数, マスターシード, 最大プロセス数(None: CPUコア数),
+#           解析的な構築の有無(基準を模擬せずに求める)
+# (戻り値)  故障解析結果
+def run_failure_analysis(topology, k: int = 1, master_seed: int = 0, max_workers: int = None,
+                         is_analytic: bool = False) -> FailureAnalysis:
+  config = st.get_config()
+  snapshot = tl.make_baseline(topology, master_seed, is_analytic)
+
+  # 基準の経路木(故障候補は基準で正常な非ルートノード)
+  nodes = tl.make_nodes(topology)
+  sn.restore_snapshot(nodes, snapshot)
+  candidates = [node for node in nodes[1:] if node.is_alive]
+  analysis = FailureAnalysis(k)
+  analysis.depths = {node.id: node.depth() for node in candidates}
+  analysis.children = find_children(nodes, candidates)
+  analysis.subtrees = {node.id: count_orphaned(analysis.children, (node.id,)) for node in candidates}
+
+  combinations = list(itertools.combinations([(node.index, node.id) for node in candidates], k))
+  max_workers = max_workers or os.cpu_count()
+  chunksize = max(1, len(combinations) // (4 * max_workers))
+  chunks = [
+    [tuple(index for index, _ in combination) for combination in combinations[i:i + chunksize]]
+    for i in range(0, len(combinations), chunksize)
+    ]
+  with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    args = [(topology, snapshot, chunk, master_seed, config) for chunk in chunks]
+    results = [result for chunk_results in executor.map(evaluate, args) for result in chunk_results]
+
+  for combination, (time, cnt) in zip(combinations, results):
+    failed_ids = tuple(id for _, id in combination)
+    analysis.results.append((failed_ids, time, cnt, count_orphaned(analysis.children, failed_ids)))
+  return analysis
+
+# 組ごとの結果のCSVファイル出力(故障ノードIDは空白区切り)
+# (引数) ファイル名, 故障解析結果
+def save_combinations(filename: str, analysis: FailureAnalysis) -> None:
+  with open(filename, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(COMBINATION_HEADER)
+    for failed_ids, time, cnt, orphaned in analysis.results:
+      writer.writerow([" ".join(str(id) for id in failed_ids), time, cnt, orphaned])
+  return
+
+# ノードごとの重要度のCSVファイル出力
+# (引数) ファイル名, 故障解析結果
+def save_criticality(filename: str, analysis: FailureAnalysis) -> None:
+  with open(filename, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(CRITICALITY_HEADER)
+    writer.writerows(analysis.criticality())
+  return
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,118 @@
+#################### frame_mod.py ####################
+# Background frame writer for LPWA network simulation
+# Note: This program needs "numpy" and "matplotlib" (and "ffmpeg" on PATH to write a video file)
+#       (Loaded by "network_plot.py" only when a figure is saved)
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############ ####################
+
+import os
+import queue
+import shutil
+import threading
+import subprocess
+import matplotlib.image as mpimg
+
+# 送信待ちフレーム数の上限(超えるとシミュレーション側が空きを待つ)
+MAX_QUEUE = 16
+
+
+################################### フレーム書き出しクラス ###################################
+# 描画済みの図の画素(RGBA配列)を受け取り，別スレッドでファイルに書き出す．
+# シミュレーション側は画素の複製のみを行い，画像の圧縮やディスクへの書き込みを待たない．
+# 待ちフレームは上限付きのキューで保持し，書き出しが追いつかないときのみ空きを待つ．
+#
+# - 画像ファイル:   フレームごとにPNGファイルを保存(ディレクトリ/fig_ステップ数.png)
+# - 動画ファイル:   全フレームを ffmpeg の標準入力へ流し込み，1つの動画ファイルに保存
+#                   (フレームの大きさは最初のフレームに揃える．ffmpeg が無いときはエラー)
+class FrameWriter:
+
+  # (引数) 画像ファイルの保存先ディレクトリ, 動画ファイル名(None: 画像ファイルで保存), 動画のフレームレート[fps],
+  #        送信待ちフレーム数の上限
+  def __init__(self, directory: str = "Figures", video_file: str = None, fps: float = 10, max_queue: int = MAX_QUEUE) -> None:
+    self.directory = directory    # 画像ファイルの保存先
+    self.video_file = video_file  # 動画ファイル名
+    self.fps = fps                # 動画のフレームレート
+    self.frames = queue.Queue(maxsize=max_queue)  # 書き出し待ちフレーム [(ステップ数, 画素), ...] (None: 終了)
+    self.process = None           # ffmpeg のプロセス
+    self.size = None              # 動画のフレームの大きさ (幅, 高さ)
+    self.error = None             # 書き出しスレッドで発生した例外
+    self.count = 0                # 書き出したフレーム数
+
+    if video_file is not None:
+      if shutil.which("ffmpeg") is None: raise RuntimeError("ffmpeg is required to write " + video_file)
+      os.makedirs(os.path.dirname(video_file) or ".", exist_ok=True)
+    else:
+      os.makedirs(directory, exist_ok=True)
+
+    self.thread = threading.Thread(target=self.run, daemon=True)
+    self.thread.start()
+    return
+
+  # フレームの追加(書き出しスレッドへ受け渡し)
+  # (引数) ステップ数, 画素(高さ x 幅 x 4 の配列．受け渡し後に変更しないこと)
+  def write(self, step: int, rgba) -> None:
+    if self.error is not None: raise self.error
+    self.frames.put((step, rgba))   # 待ちフレームが上限に達しているときは空きを待つ
+    return
+
+  # 書き出しの終了(待ちフレームをすべて書き出してから終了)
+  def close(self) -> None:
+    self.frames.put(None)
+    self.thread.join()
+    if self.error is not None: raise self.error
+    return
+
+  # 書き出しスレッドの処理
+  def run(self) -> None:
+    try:
+      while True:
+        frame = self.frames.get()
+        if frame is None: break
+        if self.error is None:  # 例外の発生後は受け取るだけにしてシミュレーション側を止めない
+          self.save(*frame)
+    except Exception as e:
+      self.error = e
+    finally:
+      if self.process is not None:
+        self.process.stdin.close()
+        self.process.wait()
+        if self.process.returncode != 0 and self.error is None:
+          self.error = RuntimeError("ffmpeg exited with code " + str(self.process.returncode))
+    return
+
+  # フレームの保存
+  # (引数) ステップ数, 画素
+  def save(self, step: int, rgba) -> None:
+    try:
+      if self.video_file is None:
+        mpimg.imsave(os.path.join(self.directory, "fig_" + str(step) + ".png"), rgba)
+      else:
+        self.stream(rgba)
+      self.count += 1
+    except Exception as e:
+      self.error = e
+    return
+
+  # 動画へのフレームの書き込み
+  # (引数) 画素
+  def stream(self, rgba) -> None:
+    height, width = rgba.shape[:2]
+    if self.process is None:
+      self.size = (width, height)
+      self.process = subprocess.Popen(
+        ["ffmpeg", "-y", "-loglevel", "error",
+         "-f", "rawvideo", "-pix_fmt", "rgba", "-s", str(width) + "x" + str(height), "-r", str(self.fps), "-i", "-",
+         "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", self.video_file],
+        stdin=subprocess.PIPE
+        )
+    if (width, height) != self.size:
+      raise ValueError("Frame size changed from " + str(self.size) + " to " + str((width, height)))
+    self.process.stdin.write(rgba.tobytes())
+    return
+
+################################# フレーム書き出しクラス終 #################################
+
+if __name__ == '__main__':
+  pass
@@ -1,6 +1,6 @@
 ############################## main.py ##############################
 # Main file for LPWA network simulation
-# Note: This program needs "network_mod.py" and "network_io.py"
+# Note: This program needs "network_mod.py", "network_io.py", and "runner_mod.py"
 # @created      2023-08-11
 # @developer    226E0214 Seiya Kinoshita
 # @affiliation  Tanaka Lab. Kyutech
@@ -8,11 +8,12 @@
 
 from network_mod import *
 from network_io import *
+import runner_mod as rn
 import random
 
 root = RootNode(0, (0, 0))   # ルートノード
 
-nodes = [
+nodes = Network([
     root,   # ルートノードを1つだけ必ず含める
 
     Node(1, (3, 3)),     Node(2, (4, 6)),     Node(3, (6, 2)),
@@ -37,7 +38,7 @@ nodes = [
     Node(52, (15, 2)),   Node(53, (-10, -13)), Node(54, (-7, 0)),
     Node(55, (-10, 9)),  Node(56, (9, 2)),     Node(57, (2, -10)),
     Node(58, (-6, 10)),  Node(59, (-14, 7)),   Node(60, (6, -14))
-]
+])
 
 step = 0  # ステップ数
 time = 0  # 経過予想時間
@@ -49,16 +50,23 @@ fig, ax = nio.init_graph()
 nio.update_graph(nodes, step, time, cnt, fig, ax)
 is_executing, is_fast_forwarding, is_reset = wait_command(nodes, step, time, cnt, fig, ax)  # コマンド受付
 
+# 早送り中のグラフの更新(一括実行のコールバック．描画頻度の上限を超える分は省略)
+def on_step(result) -> None:
+  nio.update_graph(nodes, result.step, result.time, result.cnt, fig, ax, is_throttled=True)
+
 # メインループ
 while is_executing:
 
-  # ネットワークの更新処理
-  step += 1
-  print("\n========================= Step: " + str(step) + " =========================")
-  res, time, cnt = root.update_network(nodes, time, cnt)
+  # ネットワークの更新処理(早送り中は更新処理が終了するまで一括で実行)
+  result = rn.run_until_converged(
+    nodes, step, time, cnt,
+    max_steps=None if is_fast_forwarding else 1,
+    callback=on_step if is_fast_forwarding else None, every=nio.RENDER_EVERY
+    )
+  step, time, cnt = result.step, result.time, result.cnt
   print("[Estimated elapsed time] : " + str(time) + "ms")
   print("[Communication count]    : " + str(cnt) + "\n")
-  if res == -1:
+  if result.is_converged:
     print("\n****** Network update has finished ******\n")
     is_fast_forwarding = False
 
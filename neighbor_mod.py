@@ -0,0 +1,241 @@
+#################### neighbor_mod.py ####################
+# Neighbor index for LPWA network simulation
+# Note: This program needs "numpy", "settings.py", "spatial_mod.py", and "radio_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############### ####################
+
+import numpy as np
+import settings as st
+import spatial_mod as sp
+import radio_mod as rd
+
+# 一括構築でRSSIをまとめて計算するノードの組の数(作業用配列の大きさの上限)
+PAIR_CHUNK = 1 << 18
+
+
+################################### 周囲ノード表クラス ###################################
+# ノードごとに通信可能範囲(RSSIが下限値以上)にあるノードとRSSIを事前に計算して保持する．
+# ブロードキャストや時間測定のたびにRSSIを計算し直さずに済むようにする．
+# ノードはノードリスト上の位置(ノード番号 node.index)で管理する．
+# 通信可能範囲にあるノードの探索は空間格子 SpatialGrid で候補を絞り込んでから行う．
+# RSSIは電波伝搬モデル(radio_mod.py)で候補ノードの分をまとめて計算する．
+#
+# - 周囲ノード行 rows[i]:     ノードiの通信可能範囲にあるノード番号とRSSI {j: rssi}
+# - 受信ノード一覧 receivers: ノードiの送信を受信できる正常ノードとRSSI [(node, rssi), ...]
+#                             (ノードの故障・復帰時には周囲ノードの一覧のみを破棄して再作成)
+#
+# 構築時のノードは，近傍ノードの組とRSSIを配列演算で一括計算し，周囲ノード行は参照されたときに作成する(未作成: None)．
+# 配列から読み込んだネットワーク(network_mod.py - Network.load)は，座標も参照されたときに配列から作成する．
+# 空間格子もノードの追加・移動・削除で必要になったときに作成する．
+class NeighborTable:
+
+  def __init__(self) -> None:
+    self.nodes = None     # 索引対象のノードリスト
+    self.positions = []   # 座標(ノード番号順, 未作成: None)
+    self.rows = []        # 周囲ノード行(ノード番号順, 未作成: None)
+    self.receivers = {}   # 受信ノード一覧(ノード番号: [(ノード, RSSI), ...])
+    self.grid = sp.SpatialGrid(rd.calc_max_dist())  # 空間格子(未作成: None)
+    self.geometry = st.geometry_key()               # 構築時の通信可能範囲に影響する設定値
+    self.base = None      # 配列から一括構築したときの (座標の配列, indptr, indices, RSSI)
+    return
+
+  # 周囲ノード表の構築
+  # 配列から読み込んだネットワークは配列と位置が一致している先頭のノードを，ノードリストは全ノードを一括構築
+  # (引数) ノードリスト
+  def build(self, nodes: list) -> None:
+    self.nodes = nodes
+    self.positions = []
+    self.rows = []
+    self.receivers.clear()
+    self.grid = sp.SpatialGrid(rd.calc_max_dist())  # 設定値の変更に備えて作り直す
+    self.geometry = st.geometry_key()
+    self.base = None
+    if getattr(nodes, "source", None) is not None and nodes.num_of_source > 0:
+      self.build_from_arrays(nodes.source.positions, nodes.num_of_source)
+      for node in nodes.created_nodes():    # 作成後に移動したノードの反映
+        if node.index < len(self.positions) and tuple(node.pos) != self.position(node.index):
+          self.move(node, node.pos)
+    elif len(nodes) > 0:  # ノードリストも座標を配列にまとめて一括構築
+      self.build_from_arrays(np.array([node.pos for node in nodes], dtype=np.float64), len(nodes))
+      for i, node in enumerate(nodes):
+        node.index = i
+        self.positions[i] = node.pos
+    for i in range(len(self.positions), len(nodes)):
+      self.insert(nodes[i])
+    return
+
+  # 配列からの一括構築
+  # (引数) 座標の配列(N x 2), 構築するノード数(先頭から)
+  def build_from_arrays(self, positions, size: int) -> None:
+    max_dist = rd.calc_max_dist()
+    # 距離による絞り込みは丸め誤差を見込んで緩めに行い，RSSIは絞り込んだ組の分を一括で計算して下限値で判定する
+    indptr, indices = sp.find_pairs(positions[:size], max_dist, max_dist * (1 + 1e-9))
+    sources = np.repeat(np.arange(size), np.diff(indptr))
+    points = np.asarray(positions[:size], dtype=np.float64)
+    rssis = np.concatenate([np.zeros(0)] + [
+      rd.calc_rssis(points[sources[k:k + PAIR_CHUNK]], points[indices[k:k + PAIR_CHUNK]])
+      for k in range(0, len(indices), PAIR_CHUNK)
+      ])
+    keep = rssis >= st.RSSI_LWLIM
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources[keep], minlength=size), out=indptr[1:])
+    self.base = (positions, indptr, indices[keep], rssis[keep])
+    self.positions = [None] * size
+    self.rows = [None] * size
+    self.grid = None
+    return
+
+  # 座標
+  # (引数) ノード番号
+  def position(self, i: int) -> tuple:
+    pos = self.positions[i]
+    if pos is None:
+      pos = self.positions[i] = tuple(self.base[0][i].tolist())
+    return pos
+
+  # 周囲ノード行
+  # (引数) ノード番号
+  def row(self, i: int) -> dict:
+    row = self.rows[i]
+    if row is None:
+      # 移動・削除で配列と対応しなくなるノードの周囲ノード行は，その前に作成済みになる
+      _, indptr, indices, rssis = self.base
+      start, end = indptr[i], indptr[i + 1]
+      row = self.rows[i] = dict(zip(indices[start:end].tolist(), rssis[start:end].tolist()))
+    return row
+
+  # 空間格子
+  def spatial(self) -> sp.SpatialGrid:
+    if self.grid is None:
+      self.grid = sp.SpatialGrid(rd.calc_max_dist())
+      for i in range(len(self.positions)):
+        self.grid.insert(i, self.position(i))
+    return self.grid
+
+  # ノードリストとの同期
+  # ノードリストや通信可能範囲に影響する設定値が変わったときは再構築，ノードが追加されたときは追加分のみ索引
+  # (引数) ノードリスト
+  def sync(self, nodes: list) -> None:
+    if nodes is not self.nodes or self.geometry != st.geometry_key():
+      self.build(nodes)
+      return
+    for i in range(len(self.positions), len(nodes)):
+      self.insert(nodes[i])
+    return
+
+  # 通信可能範囲にあるノードの探索
+  # (引数)    座標, 除外するノード番号
+  # (戻り値)  周囲ノード行 {ノード番号: RSSI}
+  def search_row(self, pos: tuple, index: int) -> dict:
+    candidates = [j for j in self.spatial().query(pos) if j != index]
+    return self.make_row(pos, candidates, [self.position(j) for j in candidates])
+
+  # 周囲ノード行の作成
+  # (引数)    座標, 候補ノード番号のリスト, 候補ノードの座標
+  # (戻り値)  周囲ノード行 {ノード番号: RSSI}
+  def make_row(self, pos: tuple, candidates: list, points) -> dict:
+    if not candidates: return {}
+    lwlim = st.RSSI_LWLIM
+    return {
+      j: rssi for j, rssi in zip(candidates, rd.calc_rssis(pos, points).tolist())
+      if rssi >= lwlim    # RSSIが下限値を下回ったらスキップ
+      }
+
+  # ノードの追加
+  # (引数) ノード
+  def insert(self, node) -> None:
+    node.index = len(self.positions)
+    self.positions.append(node.pos)
+    self.rows.append(self.search_row(node.pos, node.index))
+    self.spatial().insert(node.index, node.pos)
+    self.link(node.index)
+    return
+
+  # ノードの移動
+  # (引数) ノード, 移動先の座標
+  def move(self, node, pos: tuple) -> None:
+    node.pos = pos
+    if node.index is None or node.index >= len(self.positions): return  # 未索引のノードは座標のみ更新
+    self.unlink(node.index)
+    self.spatial().remove(node.index, self.position(node.index))
+    self.positions[node.index] = pos
+    self.grid.insert(node.index, pos)
+    self.rows[node.index] = self.search_row(pos, node.index)
+    self.link(node.index)
+    return
+
+  # ノードの削除
+  # 末尾のノードを削除位置へ移して詰める(ネットワーククラスのノード削除と同じ移動)
+  # (引数) 削除するノード番号
+  def remove(self, index: int) -> None:
+    last = len(self.positions) - 1
+    self.unlink(index)
+    self.spatial().remove(index, self.position(index))
+    if index != last:
+      self.grid.remove(last, self.position(last))
+      row = self.row(last)
+      for j, rssi in row.items():   # 相手側の行のノード番号を付け替え
+        other = self.row(j)
+        del other[last]
+        other[index] = rssi
+      self.rows[index] = row
+      self.positions[index] = self.positions[last]
+      self.grid.insert(index, self.positions[index])
+      self.receivers.pop(index, None)
+      self.receivers.pop(last, None)
+    self.positions.pop()
+    self.rows.pop()
+    return
+
+  # 周囲ノード行への登録(相手側の行にも追加)
+  def link(self, i: int) -> None:
+    self.receivers.pop(i, None)
+    for j, rssi in self.row(i).items():
+      self.row(j)[i] = rssi
+      self.receivers.pop(j, None)
+    return
+
+  # 周囲ノード行からの削除(相手側の行からも削除)
+  def unlink(self, i: int) -> None:
+    self.receivers.pop(i, None)
+    for j in self.row(i):
+      del self.row(j)[i]
+      self.receivers.pop(j, None)
+    self.rows[i] = {}
+    return
+
+  # ノードの故障・復帰の反映
+  # 当該ノードを受信ノードに含む周囲ノードの受信ノード一覧を破棄
+  # (引数) ノード
+  def invalidate(self, node) -> None:
+    if node.index is None or node.index >= len(self.rows): return
+    for j in self.row(node.index):
+      self.receivers.pop(j, None)
+    return
+
+  # 受信ノード一覧
+  # (引数)    送信ノード
+  # (戻り値)  受信できる正常ノードとRSSI [(ノード, RSSI), ...]
+  def receivers_of(self, node) -> list:
+    receivers = self.receivers.get(node.index)
+    if receivers is None:
+      receivers = [
+        (self.nodes[j], rssi) for j, rssi in self.row(node.index).items()
+        if self.nodes[j].is_alive   # 故障ノードは除外
+        ]
+      self.receivers[node.index] = receivers
+    return receivers
+
+  # 通信可能範囲の判定
+  # (引数)    ノード, ノード
+  # (戻り値)  True: 通信可能範囲内, False: 範囲外
+  def is_reachable(self, node0, node1) -> bool:
+    if node0 is node1: return True
+    return node1.index in self.row(node0.index)
+
+################################# 周囲ノード表クラス終 #################################
+
+if __name__ == '__main__':
+  pass
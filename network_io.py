@@ -7,131 +7,68 @@
 #################### ############# ####################
 
 import pprint
-import networkx as nx
-import matplotlib.pyplot as plt
 import network_mod as nm
 
 import time as ti
+
+# 早送り中のグラフの更新間隔[ステップ](main.py, demo.py の一括実行のコールバックで使用)
+RENDER_EVERY = 1
+# 早送り中のグラフの描画頻度の上限[fps](None: 上限なし．描画が間に合わないステップは描画しない)
+MAX_FPS = 20
  
 # グラフの初期化
+# 描画モジュール(matplotlib)は図が必要になったときに初めて読み込む
 def init_graph() -> tuple:
-  plt.close("all")  # 既存のウィンドウを閉じる
-  plt.ion()         # 対話モード(ユーザからのコマンドライン入力を受け付ける)
-
-  # 図の書式設定
-  plt.rcParams["font.family"] ="Arial"        # フォント
-  plt.rcParams["xtick.direction"] = "in"      # x軸の目盛線を内向きに
-  plt.rcParams["ytick.direction"] = "in"      # y軸の目盛線を内向きに
-  plt.rcParams["xtick.major.width"] = 1.0     # x軸主目盛り線の線幅
-  plt.rcParams["ytick.major.width"] = 1.0     # y軸主目盛り線の線幅
-  plt.rcParams["font.size"] = 20              # フォントの大きさ
-  plt.rcParams["axes.linewidth"] = 1.0        # 軸の線幅
-
-  return plt.subplots()
+  import network_plot as npl
+  return npl.init_graph()
 
 # グラフの更新
-def update_graph(nodes: list, step: int, time: int, cnt: int, fig, ax, is_fixed_axis = False, is_save = False) -> None:
-  graph = nx.DiGraph()
-  nodes_list = []
-  edges_list = []
-  pos = dict()
-
-  for node in nodes:
-    pos[node.id] = node.pos       # 座標情報
-
-    # ルートノードの色設定
-    if type(node) is nm.RootNode:
-      # 送信待ちノードのとき
-      if node.sending_pkt:
-        nodes_list.append((node.id, {"color": "orange"}))
-      # 送信済みノードのとき
-      else:
-        nodes_list.append((node.id, {"color": "c"}))
-      continue
-    
-    # 正常ノード
-    if node.is_alive:
-      # 親が存在するノードのとき
-      if node.candidate_tbl != []:
-        edges_list.append((node.id, node.uplink_id(), {"color": "black"}))
-        # 送信待ちノードのとき
-        if node.sending_pkt:
-          nodes_list.append((node.id, {"color": "orange"}))
-        # 送信済みノードのとき
-        else:
-          nodes_list.append((node.id, {"color": "c"}))
-
-      # 親が存在しないノードのとき
-      else:
-        # 送信待ちノードのとき
-        if node.sending_pkt:
-          nodes_list.append((node.id, {"color": "orange"}))
-        else:
-          nodes_list.append((node.id, {"color": "gold"}))
-
-    # 故障ノード
-    else:
-      nodes_list.append((node.id, {"color": "lightgray"}))
-
-  graph.add_nodes_from(nodes_list)      # グラフにノードを追加
-  graph.add_edges_from(edges_list)      # グラフに辺を追加
-  node_color = [node["color"] for node in graph.nodes.values()]   # ノードの色情報を格納
-  edge_color = [edge["color"] for edge in graph.edges.values()]   # 辺の色情報を格納
-  
-  ax.clear()  # 描画領域の初期化
+# 間引くとき(早送り中)は描画頻度の上限 MAX_FPS を超えないように描画を省略する
+def update_graph(nodes: list, step: int, time: int, cnt: int, fig, ax, is_fixed_axis = False, is_save = False,
+                 is_throttled = False) -> None:
+  import network_plot as npl
+  npl.update_graph(nodes, step, time, cnt, fig, ax, is_fixed_axis, is_save, MAX_FPS if is_throttled else None)
+  return
 
-  # グラフの描画
-  nx.draw(graph, pos=pos, with_labels=True, node_color=node_color,edge_color=edge_color, ax=ax)
+# 図の書き出しの開始(保存する図は別スレッドで画像ファイルまたは動画ファイルに書き出す)
+def open_frame_writer(directory: str = "Figures", video_file: str = None, fps: float = 10) -> None:
+  import network_plot as npl
+  npl.open_writer(directory, video_file, fps)
+  return
 
-  # 描画領域の書式設定
-  ax.set_aspect("equal")
-  ax.set_xlabel("x [km]", size=20, weight="light")
-  ax.set_ylabel("y [km]", size=20, weight="light")
-  ax.tick_params(left=True, bottom=True, labelleft=True, labelbottom=True)
-  ax.axis("on")
-  # 座標軸の固定
-  if is_fixed_axis:
-    ax.set_xlim([-16,16])
-    ax.set_ylim([-16,16])
-    plt.xticks([-15.0, -7.5, 0.0, 7.5, 15.0])
-    plt.yticks([-15.0, -7.5, 0.0, 7.5, 15.0])
+# 図の書き出しの終了(書き出し待ちの図をすべて書き出すまで待つ)
+def close_frame_writer() -> None:
+  import network_plot as npl
+  npl.close_writer()
+  return
 
-  # 有効数字小数点第1位
-  plt.gca().xaxis.set_major_formatter(plt.FormatStrFormatter("%.1f"))
-  plt.gca().yaxis.set_major_formatter(plt.FormatStrFormatter("%.1f"))
 
-  # 計測情報の表示
-  ax.text(0.01, 1.01, "Step: " + str(step), transform=ax.transAxes)
-  ax.text(0.5, 1.01, "Time: " + str(time) + "ms", ha="center", transform=ax.transAxes)
-  ax.text(0.99, 1.01, "Count: "  + str(cnt), ha="right", transform=ax.transAxes)
-  
-  fig.canvas.draw()
-  fig.canvas.flush_events()
-  
-  # グラフの保存
-  if is_save: plt.savefig("Figures\\fig_" + str(step), bbox_inches="tight")
-  
-  return
+# 受信パケットの文字列(トレース出力用)
+def format_received_packets(nodes: list) -> str:
+  lines = ["", "[Received packets]"]
+  for node in nodes:
+    if not node.received_pkt: continue  # 受信パケットの無いノードは非表示
+    lines.append("#" + str(node.id) + ": " + node.received_pkt.to_json(node.received_rssi))
+  lines.append("")
+  return "\n".join(lines)
 
+# 送信パケットの文字列(トレース出力用)
+def format_sending_packets(nodes: list) -> str:
+  lines = ["", "[Sending packets]"]
+  for node in nodes:
+    if not node.sending_pkt: continue   # 送信パケットの無いノードは非表示
+    lines.append("#" + str(node.id) + ": " + node.sending_pkt.to_json())
+  lines.append("")
+  return "\n".join(lines)
 
 # 受信パケットの出力
 def print_received_packets(nodes: list) -> None:
-  print()
-  print("[Received packets]")
-  for node in nodes:
-    if not node.received_pkt: continue  # 受信パケットの無いノードは非表示
-    print("#" + str(node.id) + ": " + str(node.received_pkt))
-  print()
+  print(format_received_packets(nodes))
   return
 
 # 送信パケットの出力
 def print_sending_packets(nodes: list) -> None:
-  print()
-  print("[Sending packets]")
-  for node in nodes:
-    if not node.sending_pkt: continue   # 送信パケットの無いノードは非表示
-    print("#" + str(node.id) + ": " + str(node.sending_pkt))
-  print()
+  print(format_sending_packets(nodes))
   return
 
 # 経路候補表の出力
@@ -139,9 +76,9 @@ def print_candidate_tables(nodes: list) -> None:
   print()
   print("[Routing Candidate Table] (# Node ID: [{Candidate ID, Depth, RSSI, UplinkID}, ...])")
   for node in nodes:
-    if node.candidate_tbl == []: continue # 経路情報の無いノードは非表示
+    if not node.candidate_tbl: continue   # 経路情報の無いノードは非表示
     print("# " + str(node.id) + ":")
-    pprint.pprint(node.candidate_tbl)
+    pprint.pprint(node.candidate_tbl[:])
   print()
   return
 
@@ -183,6 +120,7 @@ def wait_command(nodes: list, step: int, time: int, cnt: int, fig, ax) -> tuple:
               i               : initialize network\n\
               b               : build network\n\
               a [id] [x] [y]  : add node [id] to position [x] [y]\n\
+              v [id] [x] [y]  : move node [id] to position [x] [y]\n\
               m [id]          : enable nodes [id] ...\n\
               d [id]          : disable nodes [id] ...\n\
               r               : show routing candidate tables\n\
@@ -208,12 +146,22 @@ def wait_command(nodes: list, step: int, time: int, cnt: int, fig, ax) -> tuple:
       elif s[0] == "a":       # ノード追加
         c, id, x, y = s.split()
         if nm.search_node(nodes, id) is None:
-          nodes.append(nm.Node(id, (int(x), int(y))))
+          nodes.add(nm.Node(nm.normalize_id(id), (int(x), int(y))))
           update_graph(nodes, step, time, cnt, fig, ax)
           continue
         else:
           print("Error: Node " + str(id) + " already exists")
 
+      elif s[0] == "v":       # ノード移動
+        c, id, x, y = s.split()
+        move_node = nm.search_node(nodes, id)
+        if move_node is None:
+          print("Error: Node " + str(id) + " does not exist")
+        else:
+          move_node.move((int(x), int(y)))
+        update_graph(nodes, step, time, cnt, fig, ax)
+        continue
+
       elif s[0] == "m":     # ノード有効化(正常状態)
         c, id = s.split()
         enable_node = nm.search_node(nodes, id)
@@ -1,79 +1,165 @@
 #################### network_mod.py ####################
 # Modules of nodes for LPWA network simulation
-# Note: This program needs "settings.py" and "network_io.py"
+# Note: This program needs "settings.py", "network_io.py", "neighbor_mod.py", "packet_mod.py",
+#       "scheduler_mod.py", "trace_mod.py", "profile_mod.py", and "candidate_mod.py"
 # @created      2023-08-11
 # @developer    226E0214 Seiya Kinoshita
 # @affiliation  Tanaka Lab. Kyutech
 #################### ############## ####################
 
-import json
 import random
 import settings as st
 import network_io as nio
+import neighbor_mod as nb
+import packet_mod as pk
+import scheduler_mod as sc
+import trace_mod as tr
+import profile_mod as pf
+import candidate_mod as cd
 
 # 送信済みノード履歴(時間測定で使用)
 sent_nodes_history = []
 
+# 送信パケット数(パケットの種類ごと．添字はパケットの種類 1: Hello, 2: Bye, 3: Alone．実行結果の集計で使用)
+packet_counts = [0, 0, 0, 0]
+
+# 受信パケットを持つノード(ブロードキャストで登録し，更新処理で受信ノードのみを処理する)
+received_nodes = []
+
+# 移動したノード(移動前の周囲ノードの経路を持ち続けるため，ノード故障時は周囲ノードに加えて走査)
+moved_nodes = set()
+
+# 周囲ノード表(ブロードキャストと時間測定で使用)
+neighbor_tbl = nb.NeighborTable()
+
+# スケジューラ(送信待ちノード・送信休止中ノードの管理と時間測定で使用)
+scheduler = sc.Scheduler()
+
 
 ###################################### ノードクラス #####################################
 class Node:
 
   # 各ノードは以下の情報を記憶している
+  # 状態変数，送信パケット，送信待ち時間，送信経過時間はスケジューラに変更を通知するためプロパティで定義
   def __init__(self, ID: int, POS: tuple) -> None:
-    self.is_alive = True                  # 状態変数(True: 正常, False: 故障) 
+    self._is_alive = True                 # 状態変数(True: 正常, False: 故障) 
     self.id = ID                          # 自ノードID
+    self.index = None                     # ノード番号(周囲ノード表での位置)
     self.pos = POS                        # 座標
     self.clock = 0                        # 論理時計
-    self.sending_pkt = ""                 # 送信パケット
-    self.received_pkt = ""                # 受信パケット
-    self.waiting_time = 0                 # 送信待ち時間
-    self.pause_time = st.SENDING_INTERVAL # 送信経過時間(初期値:通信可能な時間)
-    self.candidate_tbl = []                 # 経路候補表
+    self._sending_pkt = None              # 送信パケット
+    self.received_pkt = None              # 受信パケット
+    self.received_rssi = None             # 受信パケットのRSSI
+    self._waiting_time = 0                # 送信待ち時間(設定時の値)
+    self._waiting_mark = scheduler.elapsed  # 送信待ち時間の設定時の内部経過時間
+    self._pause_time = st.SENDING_INTERVAL  # 送信経過時間(設定時の値, 初期値:通信可能な時間)
+    self._pause_mark = scheduler.elapsed    # 送信経過時間の設定時の内部経過時間
+    self.candidate_tbl = cd.CandidateTable()  # 経路候補表
     self.dnlink_ids = set()               # 子ノードリスト(ID集合)
+    self.is_moved = False                 # 移動の有無(移動前の周囲ノードが経路を持ち続けるため，故障時は全ノードを走査)
+    return
+
+  # 状態変数
+  @property
+  def is_alive(self) -> bool:
+    return self._is_alive
+
+  @is_alive.setter
+  def is_alive(self, is_alive: bool) -> None:
+    self.fix_times()  # 故障中は時間が加算されないため，切り替え前の値を確定
+    self._is_alive = is_alive
+    scheduler.update_pending(self, is_alive and bool(self._sending_pkt))
+    scheduler.push_pausing(self)
+    return
+
+  # 送信パケット
+  @property
+  def sending_pkt(self) -> pk.Packet:
+    return self._sending_pkt
+
+  @sending_pkt.setter
+  def sending_pkt(self, pkt: pk.Packet) -> None:
+    self.fix_times()  # 送信待ちの間のみ送信待ち時間が加算されるため，切り替え前の値を確定
+    self._sending_pkt = pkt
+    scheduler.update_pending(self, self._is_alive and bool(pkt))
+    return
+
+  # 送信待ち時間(正常かつ送信待ちの間は内部経過時間とともに増加)
+  @property
+  def waiting_time(self) -> int:
+    if self._is_alive and self._sending_pkt:
+      return self._waiting_time + scheduler.elapsed - self._waiting_mark
+    return self._waiting_time
+
+  @waiting_time.setter
+  def waiting_time(self, waiting_time: int) -> None:
+    self._waiting_time = waiting_time
+    self._waiting_mark = scheduler.elapsed
+    scheduler.refresh(self)
+    return
+
+  # 送信経過時間(正常な間は内部経過時間とともに増加)
+  @property
+  def pause_time(self) -> int:
+    if self._is_alive:
+      return self._pause_time + scheduler.elapsed - self._pause_mark
+    return self._pause_time
+
+  @pause_time.setter
+  def pause_time(self, pause_time: int) -> None:
+    self._pause_time = pause_time
+    self._pause_mark = scheduler.elapsed
+    scheduler.push_pausing(self)
+    scheduler.refresh(self)
     return
 
+  # 送信待ち時間と送信経過時間の確定(現在の値を設定時の値とする)
+  def fix_times(self) -> None:
+    self._waiting_time, self._waiting_mark = self.waiting_time, scheduler.elapsed
+    self._pause_time, self._pause_mark = self.pause_time, scheduler.elapsed
+    return
+
+  # 送信可能となる時刻(送信経過時間が送信休止時間に達する内部経過時間)
+  def ready_time(self) -> int:
+    return self._pause_mark + st.SENDING_INTERVAL - self._pause_time
+
   # 親ノードID
   def uplink_id(self) -> int:
-    if self.candidate_tbl == []: return None
+    if not self.candidate_tbl: return None
     return int(self.candidate_tbl[0]["candidate_id"])
   
   # 自ノード深さ
   def depth(self) -> int:
-    if self.candidate_tbl == []: return st.DEPTH_LIM
+    if not self.candidate_tbl: return st.DEPTH_LIM
     return int(self.candidate_tbl[0]["depth"] + 1)
   
   # 上方向経路RSSI
   def uplink_rssi(self) -> float:
-    if self.candidate_tbl == []: return st.DEPTH_LIM
+    if not self.candidate_tbl: return st.DEPTH_LIM
     return float(self.candidate_tbl[0]["rssi"])
   
   # Helloパケット発信
   def hello(self) -> None:
 
     if self.depth() >= st.DEPTH_LIM:       # 深さが上限を超えていたらスキップ
-      print("Warning: Depth limit exceeded!")
-      print("Is partial network completely isolated?")
+      if tr.enabled >= tr.WARNING:
+        tr.log(tr.WARNING, "Warning: Depth limit exceeded!")
+        tr.log(tr.WARNING, "Is partial network completely isolated?")
       return
 
-    self.sending_pkt = json.dumps({
-          "type"      : 1,
-          "clock"     : self.clock,
-          "my_id"     : self.id,
-          "uplink_id" : self.uplink_id(),
-          "my_depth"  : self.depth(),
-          })
+    self.sending_pkt = pk.Packet(1, self.clock, self.id, self.uplink_id(), self.depth())
     self.waiting_time = st.SENDING_TIME
     return
   
   # Byeパケット発信
   def bye(self) -> None:
-    self.sending_pkt = json.dumps({"type": 2, "clock": self.clock, "my_id": self.id})
+    self.sending_pkt = pk.Packet(2, self.clock, self.id)
     self.waiting_time = st.SENDING_TIME
     return
 
   # Aloneパケット発信
   def alone(self) -> None:
-    self.sending_pkt = json.dumps({"type": 3, "clock": self.clock, "my_id": self.id})
+    self.sending_pkt = pk.Packet(3, self.clock, self.id)
     self.waiting_time = st.SENDING_TIME
     return
   
@@ -81,9 +167,7 @@ class Node:
   # (引数)    探索する候補ノードID
   # (戻り値)  経路の順位, -1: 該当経路なし
   def search_route(self, id: int) -> int:
-    for i, route in enumerate(self.candidate_tbl):
-      if int(id) == int(route["candidate_id"]): return i
-    return -1
+    return self.candidate_tbl.search(id)
   
   # 経路候補表の経路の削除
   # (引数) 経路候補表, 削除するバックアップノードのID
@@ -92,11 +176,7 @@ class Node:
   # 0:  削除
   # -1: 該当経路なし
   def remove_route(self, id: int) -> int:
-    for i, route in enumerate(self.candidate_tbl):
-      if int(id) == int(route["candidate_id"]):
-        del self.candidate_tbl[i]
-        return int(i == 0)
-    return -1
+    return self.candidate_tbl.remove(id)
 
   # [※]経路候補表への対象経路の挿入・更新処理
   # 経路制御アルゴリズムに従う
@@ -108,8 +188,8 @@ class Node:
   def update_route(self, new_route: dict) -> int:
 
     # (1) 経路候補表に経路情報が無いとき，対象経路を追加して終了
-    if self.candidate_tbl == []:
-      self.candidate_tbl.append(new_route)
+    if not self.candidate_tbl:
+      self.candidate_tbl.insert(new_route)
       return 1
      
     # (2) 経路候補表に経路情報が存在するとき，経路候補表に送信ノードの経路が存在すれば，
@@ -120,28 +200,22 @@ class Node:
       if st.is_previous_rouing: return 0
       
       res = (self.remove_route(new_route["candidate_id"]) == 1)
-      for i, route in enumerate(self.candidate_tbl):
-        
-        # (2-1) 対象経路の深さが参照経路の深さより小さいとき，その直前に挿入して終了
-        if new_route["depth"] < route["depth"]:
-          self.candidate_tbl.insert(i, new_route)
-          return int(res or int(i == 0))
-        
-        # (2-2) 対象経路の深さが参照経路の深さと等しく，対象経路の電波強度が参照経路の電波強度より大きいとき，その直前に挿入して終了
-        #       そうでない場合，経路候補表の次の要素を参照して(2-1)から続行
-        elif new_route["depth"] == route["depth"] and new_route["rssi"] > route["rssi"]:
-          self.candidate_tbl.insert(i, new_route)
-          return int(res or int(i == 0))
-        
+
+      # (2-1), (2-2) 対象経路より深さが大きい，または深さが等しく電波強度が小さい最初の経路の直前に挿入
+      #              (経路候補表は整列済みのため，二分探索で挿入位置を求める)
+      i = self.candidate_tbl.insert(new_route)
+      if i < len(self.candidate_tbl) - 1:
+        return int(res or int(i == 0))
+
       # (3) 経路候補表末尾に対象経路を追加して終了
-      self.candidate_tbl.append(new_route)
       return int(res) if res else -1
   
   # 初期化
   def clear(self) -> None:
     self.clock = 0
-    self.sending_pkt = ""
-    self.received_pkt = ""
+    self.sending_pkt = None
+    self.received_pkt = None
+    self.received_rssi = None
     self.waiting_time = 0
     self.pause_time = st.SENDING_INTERVAL
     self.candidate_tbl.clear()
@@ -156,15 +230,17 @@ class Node:
   def broadcast(self, nodes: list) -> int:
     if not self.sending_pkt: return -1                  # 送信パケットが無いときはスキップ
     if self.pause_time < st.SENDING_INTERVAL: return -1 # 送信休止中のときはスキップ
-    for node in nodes:
-      if node is self or not node.is_alive: continue    # 故障ノードはスキップ
+    packet_counts[self.sending_pkt.type] += 1
 
-      # 送信パケットにRSSIを付加(実際のネットワークではこの計算は行わない)
-      rssi = st.calc_rssi(self.pos, node.pos)
-      if rssi < st.RSSI_LWLIM : continue                # RSSIが下限値を下回ったらスキップ
-      node.received_pkt = self.sending_pkt[:-1] + ", \"rssi\": "+ str(rssi) +"}"
+    # 周囲ノード表から受信できる正常ノードを参照(RSSIは下限値以上のもののみ)
+    neighbor_tbl.sync(nodes)
+    for node, rssi in neighbor_tbl.receivers_of(self):
+      # 送信パケットは共有し，RSSIを受信ノード側に付加(実際のネットワークではこの計算は行わない)
+      node.received_pkt = self.sending_pkt
+      node.received_rssi = rssi
+      received_nodes.append(node)
 
-    self.sending_pkt = ""   # 送信パケットの初期化
+    self.sending_pkt = None # 送信パケットの初期化
     self.waiting_time = 0   # 送信待ち時間の初期化
     self.pause_time = 0     # 送信経過時間の初期化
     return 0
@@ -178,36 +254,36 @@ class Node:
   def update(self) -> int:
     
     if not self.received_pkt: return -1         # 受信パケットが無いときはスキップ
-    items = json.loads(self.received_pkt)       # 受信パケットから必要な要素を取り出す
-    self.received_pkt = ""                      # 受信パケットを初期化
+    pkt = self.received_pkt                     # 受信パケット(送信ノードと共有)
+    self.received_pkt = None                    # 受信パケットを初期化
     if not self.is_alive: return -1             # 故障ノードはスキップ
 
     # Helloパケット受信
-    if items.get("type") == 1:
-      if items.get("clock") < self.clock: return 0    # 過去のパケットはスキップ
-      self.clock = items.get("clock")                 # 論理時計の更新
+    if pkt.type == 1:
+      if pkt.clock < self.clock: return 0       # 過去のパケットはスキップ
+      self.clock = pkt.clock                    # 論理時計の更新
         
       is_changed_parent = False   # 親ノード更新フラグ
       new_route = {
-        "candidate_id": items.get("my_id"),
-        "uplink_id"   : items.get("uplink_id"),
-        "depth"       : items.get("my_depth"),
-        "rssi"        : items.get("rssi")
+        "candidate_id": pkt.my_id,
+        "uplink_id"   : pkt.uplink_id,
+        "depth"       : pkt.my_depth,
+        "rssi"        : self.received_rssi
         }
 
       # (1) 送信ノードの親が自ノードのとき，子ノードリストに送信ノードIDを追加し，
       #     経路候補表に送信ノードの経路が存在すれば，該当経路を削除
       #     このとき，経路候補表に経路情報が存在しなくなったら終了
-      if items.get("uplink_id") == self.id:
-        self.dnlink_ids.add(items.get("my_id"))
-        is_changed_parent = (self.remove_route(items.get("my_id")) == 1)
-        if self.candidate_tbl == []: return 0
+      if pkt.uplink_id == self.id:
+        self.dnlink_ids.add(pkt.my_id)
+        is_changed_parent = (self.remove_route(pkt.my_id) == 1)
+        if not self.candidate_tbl: return 0
       
       # (2) 送信ノードの親が自ノード以外のとき
       # (2-1) 子ノードリストに送信ノードIDが含まれているとき
       # 子ノードリストから送信ノードIDを削除，経路候補表に送信ノードの経路を挿入・更新処理[※]
-      elif items.get("my_id") in self.dnlink_ids:
-        self.dnlink_ids.remove(items.get("my_id"))
+      elif pkt.my_id in self.dnlink_ids:
+        self.dnlink_ids.remove(pkt.my_id)
         is_changed_parent = (self.update_route(new_route) == 1)
 
       # (2-2) 子ノードリストに送信ノードIDが含まれていないとき，経路候補表に送信ノードの経路を挿入・更新[※]
@@ -221,16 +297,16 @@ class Node:
       return 0
     
     # Byeパケット受信
-    elif items.get("type") == 2:
-      if items.get("clock") < self.clock : return 0   # 過去のパケットはスキップ
-      elif items.get("clock") == self.clock:
-        if items.get("my_id") in self.dnlink_ids:     # 子ノードIDの削除
-          self.dnlink_ids.remove(items.get("my_id"))
+    elif pkt.type == 2:
+      if pkt.clock < self.clock : return 0        # 過去のパケットはスキップ
+      elif pkt.clock == self.clock:
+        if pkt.my_id in self.dnlink_ids:          # 子ノードIDの削除
+          self.dnlink_ids.remove(pkt.my_id)
         return 0
-      if self.candidate_tbl == []: return 0             # 初期化済みのときはスキップ
+      if not self.candidate_tbl: return 0               # 初期化済みのときはスキップ
       
       self.candidate_tbl.clear()
-      self.clock = items.get("clock")                 # 論理時計の更新
+      self.clock = pkt.clock                      # 論理時計の更新
       
       # Byeパケットの中継
       self.bye()
@@ -238,41 +314,60 @@ class Node:
     
     # Aloneパケット受信
     # 今回論理時計clockは考慮しない
-    elif items.get("type") == 3:
-      if items.get("my_id") == self.uplink_id():
-        self.remove_route(items.get("my_id"))
-        if self.candidate_tbl != []: self.hello() # Helloパケット発信
+    elif pkt.type == 3:
+      if pkt.my_id == self.uplink_id():
+        self.remove_route(pkt.my_id)
+        if self.candidate_tbl: self.hello()       # Helloパケット発信
         else: self.alone()                      # Aloneパケット中継
         return 1
     return 0
   
+  # ノード移動
+  # (引数) 移動先の座標
+  def move(self, pos: tuple) -> None:
+    neighbor_tbl.move(self, pos)  # 周囲ノード表の当該ノードの行を再計算
+    self.is_moved = True
+    moved_nodes.add(self)
+    return
+
   # ノード復帰
   def enable(self) -> None:
     self.is_alive = True
+    neighbor_tbl.invalidate(self)
     return
 
   # ノード故障
   def disable(self, nodes: list) -> None:
     self.is_alive = False
+    neighbor_tbl.invalidate(self)
 
     if not st.is_previous_rouing:
       # 経路候補表の停止ノードの経路を削除(実際は周囲ノードが異常を検知して自ら削除)
-      for node in nodes:
+      # 停止ノードの経路を持つのは通信可能範囲のノードと移動したノードのみのため，それらをノード番号順に走査
+      # (停止ノード自身が移動したときは，移動前の周囲ノードが分からないため全ノードを走査)
+      if self.is_moved: neighbors = nodes
+      else:
+        neighbor_tbl.sync(nodes)
+        indices = set(neighbor_tbl.row(self.index))
+        indices.update(node.index for node in moved_nodes if is_member(nodes, node))
+        neighbors = [nodes[j] for j in sorted(indices)]
+      for node in neighbors:
         if type(node) is RootNode: continue
         if not node.is_alive: continue
         if node.remove_route(self.id) == 1:
 
           # ネットワーク孤立判定
-          if node.candidate_tbl == []:
-            print("Warning: Node " + str(node.id) + " may be alone.")
+          if not node.candidate_tbl:
+            if tr.enabled >= tr.WARNING: tr.log(tr.WARNING, "Warning: Node " + str(node.id) + " may be alone.")
             # 子ノードがいるときは，子ノードに新しい親を探させる
             if node.dnlink_ids != []: node.alone()  # Aloneパケット発信
           else: node.hello()                        # Helloパケット発信
 
       # 親ノードの子ノード情報を削除
+      # (他のノードの故障で親が替わった直後は，新しい親がまだ子ノード情報を持っていないことがある)
       if self.uplink_id() != None:
         uplink_node = search_node(nodes, self.uplink_id())
-        uplink_node.dnlink_ids.remove(self.id)
+        uplink_node.dnlink_ids.discard(self.id)
     
     self.clear()  # 故障ノードを初期化
     return
@@ -290,71 +385,52 @@ class RootNode(Node): # ノードクラスを継承
     return 0
   
   def hello(self) -> None:
-    self.sending_pkt = json.dumps({
-    "type"      : 1,
-    "clock"     : self.clock,
-    "my_id"     : self.id,
-    "uplink_id" : 0,
-    "my_depth"  : 0,
-    })
+    self.sending_pkt = pk.Packet(1, self.clock, self.id, 0, 0)
     self.waiting_time = st.SENDING_TIME
     return
 
   def broadcast(self, nodes: list) -> int:
-    if not self.sending_pkt: return -1                  # 送信パケットが無いときはスキップ
-    if self.pause_time < st.SENDING_INTERVAL: return -1 # 送信休止中のときはスキップ
-    for node in nodes:
-      if node is self or not node.is_alive: continue    # 故障ノードはスキップ
-
-      # 送信パケットにRSSIを付加(実際のネットワークではこの計算は行わない)
-      rssi = st.calc_rssi(self.pos, node.pos)
-      if rssi < st.RSSI_LWLIM : continue                # RSSIが下限値を下回ったらスキップ
-      node.received_pkt = self.sending_pkt[:-1] + ", \"rssi\": "+ str(rssi) +"}"
-
-    self.sending_pkt = ""   # 送信パケットの初期化
-    self.waiting_time = 0   # 送信待ち時間の初期化
-    self.pause_time = 0     # 送信経過時間の初期化
-
-    print("Note: Root node sent a packet!")
+    if super().broadcast(nodes) == -1: return -1
+    if tr.enabled >= tr.NOTE: tr.log(tr.NOTE, "Note: Root node sent a packet!")
     return 0
 
   def update(self) -> int:
     if not self.received_pkt: return -1         # 受信パケットが無いときはスキップ
-    items = json.loads(self.received_pkt)       # 受信パケットから必要な要素を取り出す
-    self.received_pkt = ""                      # 受信パケットを初期化
+    pkt = self.received_pkt                     # 受信パケット(送信ノードと共有)
+    self.received_pkt = None                    # 受信パケットを初期化
 
     # Helloパケットを受信したときは子ノード情報を更新
-    if items.get("type") == 1:
-      if items.get("uplink_id") == self.id:
-        self.dnlink_ids.add(items.get("my_id"))
+    if pkt.type == 1:
+      if pkt.uplink_id == self.id:
+        self.dnlink_ids.add(pkt.my_id)
 
     # Byeパケットを受信したときは子ノード情報を削除
-    elif items.get("type") == 2:
-      if items.get("my_id") in self.dnlink_ids:
-        self.dnlink_ids.remove(items.get("my_id"))
+    elif pkt.type == 2:
+      if pkt.my_id in self.dnlink_ids:
+        self.dnlink_ids.remove(pkt.my_id)
 
     return 0
 
   # Helloパケット発信
   def build_network(self) -> None:
     if self.pause_time < st.SENDING_INTERVAL: # 送信休止中のとき
-      print("Note: Root node is pausing. Pause time: " + str(self.pause_time))
+      tr.log(tr.NOTE, "Note: Root node is pausing. Pause time: " + str(self.pause_time))
     if self.clock % 2 == 0:                   # ネットワークの状態を論理時計でチェック
       self.clock += 1
       self.hello()
     else:
-      print("Note: Hello packet has already sent!")
+      tr.log(tr.NOTE, "Note: Hello packet has already sent!")
     return
   
   # Byeパケット発信
   def init_network(self) -> None:
     if self.pause_time < st.SENDING_INTERVAL: # 送信休止中のとき
-      print("Note: Root node is pausing. Count of pause: " + str(self.pause_time))
+      tr.log(tr.NOTE, "Note: Root node is pausing. Count of pause: " + str(self.pause_time))
     if self.clock % 2 == 1:                   # ネットワークの状態を論理時計でチェック
       self.clock += 1
       self.bye()
     else:
-      print("Note: Bye packet has already sent!")
+      tr.log(tr.NOTE, "Note: Bye packet has already sent!")
     return
 
   # ネットワーク更新処理
@@ -364,73 +440,69 @@ class RootNode(Node): # ノードクラスを継承
   #  0: 送信ノードの1つを処理
   # -1: 更新終了
   def update_network(self, nodes: list, time: int, cnt: int) -> tuple:
+    if pf.enabled: start = pf.now()   # 区間ごとの計測(profile_mod.py)
+    sync_nodes(nodes)
     
     # 送信待ちノードの存在判定
-    for i, node in enumerate(nodes):
-      if node.is_alive and node.sending_pkt: break
-      # 送信待ちノードがいないとき
-      if i == len(nodes)-1:
-        # さらに送信休止中のノード判定
-        for node in nodes:
-          # 送信待ちノードは無いが，送信休止中のノードがあるときは時間を加算してスキップ
-          if node.pause_time < st.SENDING_INTERVAL:
-            print("Note: There are the pausing nodes.")
-            time += st.SENDING_TIME
-            sent_nodes_history.clear()
-            for node in nodes:
-              if node.is_alive: node.pause_time += st.SENDING_TIME
-            return 0, time, cnt
-        return -1, time, cnt  # すべてのノードが送信可能になってネットワークの処理が終了
+    if not scheduler.pending:
+      # 送信待ちノードは無いが，送信休止中のノードがあるときは時間を加算してスキップ
+      # (送信経過時間の加算はスケジューラの内部経過時間で一括して行う)
+      # 時間を一度に進めるときは，すべてのノードの送信休止が終了する時刻まで進める
+      if scheduler.has_pausing():
+        if tr.enabled >= tr.NOTE: tr.log(tr.NOTE, "Note: There are the pausing nodes.")
+        steps = scheduler.count_steps(scheduler.last_ready_time()) if st.is_jump_ahead else 1
+        time += steps * st.SENDING_TIME
+        sent_nodes_history.clear()
+        scheduler.advance(steps * st.SENDING_TIME)
+        if pf.enabled: pf.lap(pf.SEARCH, start)
+        return 0, time, cnt
+      if pf.enabled: pf.lap(pf.SEARCH, start)
+      return -1, time, cnt  # すべてのノードが送信可能になってネットワークの処理が終了
 
     # 送信待ちノードをランダムに選択してブロードキャスト
-    # 重みを付けてランダムに選ばせる
-    weights = [
-      (
-        node.waiting_time                           # 受信順
-        * (node.is_alive)                           # 正常ノード判定
-        * (node.pause_time >= st.SENDING_INTERVAL)  # 送信休止中ノード判定
-       )
-      for node in nodes
-      ]
-    
-    # 送信できる送信待ちノードがいない(重みがすべて0)ときは時間を加算してスキップ
-    if sum(weights) == 0:
-      print("Note: There are pausing nodes, which have a sending packet.")
-      time += st.SENDING_TIME
+    # 重み(送信待ち時間: 受信順)を付けてランダムに選ばせる(抽選木でO(log N))
+    # 送信できる送信待ちノードがいない(重みの総和が0)ときは時間を加算してスキップ
+    # 時間を一度に進めるときは，送信待ちノードのいずれかが送信可能となる時刻まで進める
+    if pf.enabled: start = pf.lap(pf.SEARCH, start)
+    if scheduler.total_weight() == 0:
+      if tr.enabled >= tr.NOTE: tr.log(tr.NOTE, "Note: There are pausing nodes, which have a sending packet.")
+      steps = scheduler.count_steps(scheduler.next_ready_time()) if st.is_jump_ahead else 1
+      time += steps * st.SENDING_TIME
       sent_nodes_history.clear()
-
-      # 送信経過時間，送信待ち時間の加算
-      for node in nodes:
-        if node.is_alive:
-          node.pause_time += st.SENDING_TIME
-          if node.sending_pkt:
-            node.waiting_time += st.SENDING_TIME
+      scheduler.advance(steps * st.SENDING_TIME)  # 送信経過時間，送信待ち時間の加算
+      if pf.enabled: pf.lap(pf.SELECT, start)
       return 0, time, cnt
     
-    sending_node = random.choices(nodes, weights=weights)[0]
+    sending_node = scheduler.choose(random.random())
+    if pf.enabled: start = pf.lap(pf.SELECT, start)
     sending_node.broadcast(nodes)
     cnt += 1
-    nio.print_received_packets(nodes)  # 受信パケットの確認
+    if pf.enabled: pf.lap(pf.BROADCAST, start)
+    if tr.enabled >= tr.PACKET: tr.log(tr.PACKET, nio.format_received_packets(nodes))  # 受信パケットの確認
     
+    if pf.enabled: start = pf.now()   # 出力の時間は含めない
     # 経過時間の計算と時間の更新
     is_time_elapsed = False
     for sent_node in sent_nodes_history:
-      if st.calc_rssi(sending_node.pos, sent_node.pos) >= st.RSSI_LWLIM:
+      if neighbor_tbl.is_reachable(sending_node, sent_node):
         time += st.SENDING_TIME
         sent_nodes_history.clear()
         is_time_elapsed = True
         
     sent_nodes_history.append(sending_node)
+
+    # 時間経過を検知したら送信経過時間，送信待ち時間の加算
+    if is_time_elapsed: scheduler.advance(st.SENDING_TIME)
+    if pf.enabled: start = pf.lap(pf.COLLISION, start)
     
-    for node in nodes:
-      if node.is_alive:
-        if is_time_elapsed:                     # 時間経過を検知したら
-          node.pause_time += st.SENDING_TIME    # 送信経過時間の加算
-          if node.sending_pkt:                  # 送信待ちのときは送信待ち時間を加算
-            node.waiting_time += st.SENDING_TIME
-      node.update()   # 各ノードが受信パケットを確認して送信パケットを作成
+    # 受信ノードのみが受信パケットを確認して送信パケットを作成(ノード番号順)
+    received_nodes.sort(key=lambda node: node.index)
+    for node in received_nodes:
+      node.update()
+    received_nodes.clear()
+    if pf.enabled: pf.lap(pf.UPDATE, start)
                 
-    nio.print_sending_packets(nodes)   # 送信パケットの確認
+    if tr.enabled >= tr.PACKET: tr.log(tr.PACKET, nio.format_sending_packets(nodes))   # 送信パケットの確認
 
     return 0, time, cnt
 
@@ -440,19 +512,202 @@ class RootNode(Node): # ノードクラスを継承
     return
 #################################### ルートノードクラス終 ###################################
 
+
+###################################### ネットワーククラス #####################################
+# ネットワークを構成するノードを保持する(ノードリストの代わりに各関数へ渡す)．
+# ノードリストと同様に，ノード番号(周囲ノード表での位置)による参照と反復ができる．
+# IDからノード番号への辞書とルートノードへの参照を持ち，ノードの探索・追加・削除・故障・復帰をO(1)で行う．
+# ノードIDは整数に揃える(コマンド入力の文字列IDも整数として登録・探索する)．
+#
+# - ノードの追加: 末尾に追加(周囲ノード表とスケジューラには次回の同期で追加分のみ登録)
+# - ノードの削除: 末尾のノードを削除位置へ移して詰める(周囲ノード表とスケジューラの該当要素も移動)
+# - 配列からの読み込み: ID・座標・状態変数の配列(topology_mod.py のトポロジー)を保持し，
+#                       ノードオブジェクトは参照されたときに作成する(未作成のノードは初期状態)
+class Network:
+
+  # (引数) ノードリスト(ルートノードを1つだけ含める)
+  def __init__(self, nodes: list = ()) -> None:
+    self.nodes = []         # ノード(ノード番号順, 未作成: None)
+    self.index_of = {}      # ノードID: ノード番号(配列から読み込んだときは初めての探索時に作成)
+    self.root = None        # ルートノード
+    self.source = None      # 未作成のノードの配列(ids, positions, alive)
+    self.num_of_source = 0  # 配列と位置が一致している先頭のノード数(周囲ノード表の一括構築に使用)
+    for node in nodes: self.add(node)
+    return
+
+  # 配列からの読み込み
+  # 先頭をルートノードとし，他のノードは参照されたときに作成する
+  # (引数) ID・座標・状態変数の配列を持つトポロジー(状態変数はNoneのとき全て正常)
+  def load(self, source) -> None:
+    if self.nodes: raise ValueError("Network is not empty")
+    self.source = source
+    self.num_of_source = len(source.ids)
+    self.nodes = [None] * self.num_of_source
+    self.index_of = None
+    self.root = RootNode(int(source.ids[0]), tuple(source.positions[0].tolist()))
+    self.root.index = 0
+    self.nodes[0] = self.root
+    return
+
+  def __len__(self) -> int:
+    return len(self.nodes)
+
+  # ノード番号(またはスライス)によるノードの参照
+  def __getitem__(self, i):
+    if isinstance(i, slice): return [self[k] for k in range(*i.indices(len(self.nodes)))]
+    node = self.nodes[i]
+    if node is None: node = self.create(i % len(self.nodes))
+    return node
+
+  def __iter__(self):
+    if self.source is None: return iter(self.nodes)
+    return (self[i] for i in range(len(self.nodes)))
+
+  def __contains__(self, node) -> bool:
+    return node.index is not None and node.index < len(self.nodes) and self.nodes[node.index] is node
+
+  # 配列のノードの作成
+  # (引数)    ノード番号
+  # (戻り値)  作成したノード
+  def create(self, i: int) -> Node:
+    node = Node(int(self.source.ids[i]), tuple(self.source.positions[i].tolist()))
+    node.index = i
+    if self.source.alive is not None and not self.source.alive[i]:
+      node._is_alive = False  # 初期状態のため通知は不要
+    self.nodes[i] = node
+    return node
+
+  # 作成済みのノード(未作成のノードは初期状態のため，全ノードの初期化や登録で走査を省ける)
+  def created_nodes(self) -> list:
+    if self.source is None: return self.nodes
+    return [node for node in self.nodes if node is not None]
+
+  # ノードIDからノード番号への辞書
+  def index_map(self) -> dict:
+    if self.index_of is None:
+      self.index_of = dict(zip(self.source.ids.tolist(), range(len(self.source.ids))))
+    return self.index_of
+
+  # ノード探索
+  # (引数)    ノードID
+  # (戻り値)  ノードオブジェクト(該当ノードなし: None)
+  def get(self, id) -> Node:
+    i = self.index_map().get(normalize_id(id))
+    return None if i is None else self[i]
+
+  # ノード追加
+  # (引数)    ノード
+  # (戻り値)  追加したノード
+  def add(self, node: Node) -> Node:
+    node.id = normalize_id(node.id)
+    if node.id in self.index_map(): raise ValueError("Node " + str(node.id) + " already exists")
+    if type(node) is RootNode:
+      if self.root is not None: raise ValueError("Root node already exists")
+      self.root = node
+    node.index = len(self.nodes)
+    self.nodes.append(node)
+    self.index_of[node.id] = node.index
+    return node
+
+  # ノード削除
+  # 故障させて周囲ノードの経路候補表から取り除いてから，ネットワークから削除する
+  # (引数)    ノードID
+  # (戻り値)  削除したノード
+  def remove(self, id) -> Node:
+    node = self.get(id)
+    if node is None: raise KeyError("Node " + str(id) + " does not exist")
+    if node is self.root: raise ValueError("Root node cannot be removed")
+    if node.is_alive: node.disable(self)
+    if neighbor_tbl.nodes is self: neighbor_tbl.sync(self)   # 未登録の追加分を登録してから削除
+    if scheduler.nodes is self: scheduler.sync(self)
+    if node in sent_nodes_history: sent_nodes_history.remove(node)
+    if node in received_nodes: received_nodes.remove(node)
+    moved_nodes.discard(node)
+
+    index, last = node.index, len(self.nodes) - 1
+    moved = self[last]  # 移動するノードは配列との対応が崩れるため作成しておく
+    if neighbor_tbl.nodes is self: neighbor_tbl.remove(index)
+    if scheduler.nodes is self: scheduler.remove(node, index, last)
+    self.nodes.pop()
+    if moved is not node:
+      self.nodes[index] = moved
+      moved.index = index
+      self.index_of[moved.id] = index
+    del self.index_of[node.id]
+    self.num_of_source = min(self.num_of_source, index)
+    node.index = None
+    return node
+
+  # ノード復帰
+  # (引数) ノードID
+  def enable(self, id) -> None:
+    self.get(id).enable()
+    return
+
+  # ノード故障
+  # (引数) ノードID
+  def disable(self, id) -> None:
+    self.get(id).disable(self)
+    return
+
+#################################### ネットワーククラス終 ###################################
+
 #################### 予備関数 ####################
+# ノードリストと周囲ノード表・スケジューラの同期
+# ノードリストが変わったときは送信済みノード履歴と受信ノードも初期化
+# (引数) ノードリスト
+def sync_nodes(nodes: list) -> None:
+  if nodes is not scheduler.nodes:
+    sent_nodes_history.clear()
+    received_nodes.clear()
+  neighbor_tbl.sync(nodes)
+  scheduler.sync(nodes)
+  return
+
+# 処理の進み具合(全ノードを走査せずにスケジューラの集計値から求める．プログレスバーなどの表示用)
+# (引数)    ネットワーク(またはノードリスト)
+# (戻り値)  (送信待ちノード数, 送信休止中ノード数) (どちらも0のとき更新処理は終了)
+def progress(nodes: list) -> tuple:
+  sync_nodes(nodes)
+  return scheduler.progress()
+
+# ノードリストの初期化
+# 故障ノードを復帰させ，全ノードを初期状態に戻す(同じノードリストで試行を繰り返すときに使用)
+# (引数) ノードリスト
+def reset_nodes(nodes: list) -> None:
+  sent_nodes_history.clear()
+  received_nodes.clear()
+  if isinstance(nodes, Network): nodes = nodes.created_nodes()  # 未作成のノードは初期状態
+  for node in nodes:
+    if not node.is_alive: node.enable()
+    node.clear()
+  return
+
+# ノードリストに含まれるノードか判定(ノード番号による判定．ノードリストの走査は行わない)
+# (引数)    ネットワーク(またはノードリスト), ノード
+def is_member(nodes: list, node) -> bool:
+  return node.index is not None and node.index < len(nodes) and nodes[node.index] is node
+
+# ノードIDの正規化(文字列のIDも整数に揃える)
+# (引数)    ノードID
+# (戻り値)  整数のノードID
+def normalize_id(id) -> int:
+  return int(id)
+
 # ノード探索
-# (引数)    ノードリスト, ノードID 
+# (引数)    ネットワーク(またはノードリスト), ノードID 
 # (戻り値)  ノードオブジェクト
 def search_node(nodes: list, id: int) -> Node:
+  if isinstance(nodes, Network): return nodes.get(id)
   for node in nodes:
     if int(id) == int(node.id): return node
   return None
 
 # ルートノード探索
-# (引数)    ノードリスト
+# (引数)    ネットワーク(またはノードリスト)
 # (戻り値)  ルートノードオブジェクト
 def search_root_node(nodes: list) -> RootNode:
+  if isinstance(nodes, Network): return nodes.root
   for node in nodes:
     if type(node) is RootNode: return node
   return None
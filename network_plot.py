@@ -0,0 +1,267 @@
+#################### network_plot.py ####################
+# Graph drawing functions for LPWA network simulation
+# Note: This program needs "network_mod.py", numpy, and matplotlib
+#       (Loaded by "network_io.py" only when a figure is requested)
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############### ####################
+
+import atexit
+import time as ti
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import colors
+from matplotlib.collections import PathCollection
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+import network_mod as nm
+import profile_mod as pf
+
+# ノードの大きさ[pt^2]とラベルの文字の大きさ[pt](networkx の既定値と同じ)
+NODE_SIZE = 300
+LABEL_SIZE = 12
+
+# 描画中の図(描画領域: 描画器)
+renderers = {}
+
+# 図の保存先(フレーム書き出しを開かずに保存したときに使用)
+FIGURE_DIR = "Figures"
+
+# フレーム書き出し(frame_mod.py - FrameWriter, None: 未使用)
+writer = None
+
+# グラフの初期化
+def init_graph() -> tuple:
+  plt.close("all")  # 既存のウィンドウを閉じる
+  renderers.clear()
+  plt.ion()         # 対話モード(ユーザからのコマンドライン入力を受け付ける)
+
+  # 図の書式設定
+  plt.rcParams["font.family"] ="Arial"        # フォント
+  plt.rcParams["xtick.direction"] = "in"      # x軸の目盛線を内向きに
+  plt.rcParams["ytick.direction"] = "in"      # y軸の目盛線を内向きに
+  plt.rcParams["xtick.major.width"] = 1.0     # x軸主目盛り線の線幅
+  plt.rcParams["ytick.major.width"] = 1.0     # y軸主目盛り線の線幅
+  plt.rcParams["font.size"] = 20              # フォントの大きさ
+  plt.rcParams["axes.linewidth"] = 1.0        # 軸の線幅
+
+  return plt.subplots()
+
+
+###################################### 描画器クラス #####################################
+# 描画領域ごとにノード・辺・ラベルの描画要素を1度だけ作成して保持する．
+# 更新時は状態(色・親ノード)が変わったノードの要素のみを書き換え，描画領域の初期化と全体の再描画は行わない．
+# ノードの追加・移動・削除でノード構成が変わったときのみ描画要素を作り直す．
+#
+# - ノード:   散布図(ノードごとの色を配列で保持)
+# - 辺:       子ノードから親ノードへの矢印(ノードごとに1本．親の無いノードは透明)
+# - ラベル:   ノードID
+# - 計測情報: ステップ数，予想経過時間，通信回数
+class GraphRenderer:
+
+  def __init__(self, fig, ax) -> None:
+    self.fig = fig
+    self.ax = ax
+    self.layout = None      # 描画要素の作成時のノード構成 [(ID, 座標), ...]
+    self.index_of = {}      # ノードID: 描画要素の番号
+    self.positions = None   # 座標の配列(描画要素の番号順)
+    self.colors = []        # ノードの色の名前(描画要素の番号順)
+    self.uplinks = []       # 親ノードID(描画要素の番号順, None: 親なし)
+    self.scatter = None     # ノードの散布図
+    self.arrows = None      # 辺の矢印
+    self.labels = None      # ノードIDのラベル
+    self.texts = None       # 計測情報の表示
+    self.last_drawn = 0.0   # 最後に描画した時刻(描画頻度の上限の判定に使用)
+    return
+
+  # 描画要素の作成
+  # (引数) ノードリスト, ノード構成, 座標軸の固定の有無
+  def build(self, nodes: list, layout: list, is_fixed_axis: bool) -> None:
+    ax = self.ax
+    ax.clear()  # 描画領域の初期化
+    self.arrows = None
+    self.layout = layout
+    self.index_of = {id: k for k, (id, _) in enumerate(layout)}
+    self.colors = [color_of(node) for node in nodes]
+    self.uplinks = [uplink_of(node) for node in nodes]
+    self.positions = np.array([pos for _, pos in layout], dtype=float).reshape(-1, 2)
+
+    self.scatter = ax.scatter(
+      self.positions[:, 0], self.positions[:, 1], s=NODE_SIZE, c=[colors.to_rgba(c) for c in self.colors], zorder=2
+      )
+    # ラベルは文字の輪郭を1つの集合として描画(文字列を個別に配置するより高速)
+    self.labels = PathCollection(
+      [label_path(str(id)) for id, _ in layout], offsets=self.positions, offset_transform=ax.transData,
+      transform=Affine2D().scale(1 / 72) + self.fig.dpi_scale_trans, facecolors="black", edgecolors="none", zorder=3
+      )
+    ax.add_collection(self.labels, autolim=False)
+
+    # 描画領域の書式設定
+    ax.set_aspect("equal")
+    ax.set_xlabel("x [km]", size=20, weight="light")
+    ax.set_ylabel("y [km]", size=20, weight="light")
+    ax.tick_params(left=True, bottom=True, labelleft=True, labelbottom=True)
+    ax.axis("on")
+    # 座標軸の固定
+    if is_fixed_axis:
+      ax.set_xlim([-16,16])
+      ax.set_ylim([-16,16])
+      ax.set_xticks([-15.0, -7.5, 0.0, 7.5, 15.0])
+      ax.set_yticks([-15.0, -7.5, 0.0, 7.5, 15.0])
+    else:
+      ax.margins(0.05)
+      ax.autoscale_view()
+
+    # 有効数字小数点第1位
+    ax.xaxis.set_major_formatter(plt.FormatStrFormatter("%.1f"))
+    ax.yaxis.set_major_formatter(plt.FormatStrFormatter("%.1f"))
+
+    # 辺の矢印(座標軸の確定後に作成し，親ノードの円の縁で止める)
+    self.arrows = ax.quiver(
+      self.positions[:, 0], self.positions[:, 1], *self.arrow_vectors(range(len(layout))),
+      angles="xy", scale_units="xy", scale=1, width=0.003, headwidth=6, headlength=8, zorder=1
+      )
+    self.arrows.set_color(self.arrow_colors())
+
+    # 計測情報の表示
+    self.texts = (
+      ax.text(0.01, 1.01, "", transform=ax.transAxes),
+      ax.text(0.5, 1.01, "", ha="center", transform=ax.transAxes),
+      ax.text(0.99, 1.01, "", ha="right", transform=ax.transAxes)
+      )
+    return
+
+  # 矢印の向きと長さ
+  # (引数)    描画要素の番号
+  # (戻り値)  x成分の配列, y成分の配列(親の無いノードは0)
+  def arrow_vectors(self, indices) -> tuple:
+    # ノードの半径を座標の単位に換算
+    scale = self.ax.transData.transform([(1, 0), (0, 0)])
+    radius = (NODE_SIZE ** 0.5 / 2) * self.fig.dpi / 72 / max(abs(scale[0, 0] - scale[1, 0]), 1e-9)
+    u = np.zeros(len(self.layout)) if self.arrows is None else self.arrows.U.copy()
+    v = np.zeros(len(self.layout)) if self.arrows is None else self.arrows.V.copy()
+    for k in indices:
+      j = self.index_of.get(self.uplinks[k])
+      if j is None:
+        u[k] = v[k] = 0.0
+        continue
+      d = self.positions[j] - self.positions[k]
+      length = float(np.hypot(*d))
+      d *= max(length - radius, 0.0) / length if length > 0 else 0.0
+      u[k], v[k] = d
+    return u, v
+
+  # 矢印の色(親の無いノードは透明)
+  def arrow_colors(self) -> np.ndarray:
+    rgba = np.zeros((len(self.layout), 4))
+    rgba[[k for k, id in enumerate(self.uplinks) if id in self.index_of], 3] = 1.0
+    return rgba
+
+  # グラフの更新
+  # 状態が変わったノードの色と矢印のみを書き換える
+  # (引数) ノードリスト, ステップ数, 予想経過時間, 通信回数, 座標軸の固定の有無
+  def update(self, nodes: list, step: int, time: int, cnt: int, is_fixed_axis: bool) -> None:
+    nodes = list(nodes)
+    layout = [(node.id, tuple(node.pos)) for node in nodes]
+    if layout != self.layout:
+      self.build(nodes, layout, is_fixed_axis)
+    else:
+      changed_colors, changed_uplinks = [], []
+      for k, node in enumerate(nodes):
+        color, uplink_id = color_of(node), uplink_of(node)
+        if color != self.colors[k]:
+          self.colors[k] = color
+          changed_colors.append(k)
+        if uplink_id != self.uplinks[k]:
+          self.uplinks[k] = uplink_id
+          changed_uplinks.append(k)
+      if changed_colors:
+        facecolors = self.scatter.get_facecolors()
+        for k in changed_colors: facecolors[k] = colors.to_rgba(self.colors[k])
+        self.scatter.set_facecolors(facecolors)
+      if changed_uplinks:
+        self.arrows.set_UVC(*self.arrow_vectors(changed_uplinks))
+        self.arrows.set_color(self.arrow_colors())
+
+    self.texts[0].set_text("Step: " + str(step))
+    self.texts[1].set_text("Time: " + str(time) + "ms")
+    self.texts[2].set_text("Count: "  + str(cnt))
+    self.fig.canvas.draw()
+    self.fig.canvas.flush_events()
+    return
+
+#################################### 描画器クラス終 ###################################
+
+
+# ラベルの文字の輪郭(中央揃え, 単位: pt)
+# (引数)    文字列
+# (戻り値)  輪郭のパス
+def label_path(label: str) -> TextPath:
+  path = TextPath((0, 0), label, size=LABEL_SIZE)
+  extents = path.get_extents()
+  return path.transformed(Affine2D().translate(-(extents.x0 + extents.x1) / 2, -(extents.y0 + extents.y1) / 2))
+
+# ノードの色
+# (引数)    ノード
+# (戻り値)  色の名前
+def color_of(node) -> str:
+  if not node.is_alive: return "lightgray"        # 故障ノード
+  if node.sending_pkt: return "orange"            # 送信待ちノード
+  if type(node) is nm.RootNode or node.candidate_tbl: return "c"  # 送信済みノード
+  return "gold"                                   # 親が存在しないノード
+
+# 辺を描く親ノードID
+# (引数)    ノード
+# (戻り値)  親ノードID(ルートノード・故障ノード・親が存在しないノード: None)
+def uplink_of(node):
+  if type(node) is nm.RootNode or not node.is_alive or not node.candidate_tbl: return None
+  return node.uplink_id()
+
+# グラフの更新
+# 描画領域ごとの描画器で，状態が変わった部分のみを更新して描画する
+# 間引くとき(早送り中など)は，前回の描画から描画間隔 1/max_fps 秒が経っていなければ描画しない
+# (引数) ノードリスト, ステップ数, 予想経過時間, 通信回数, 図, 描画領域, 座標軸の固定の有無, 保存の有無,
+#        描画頻度の上限[fps](None: 間引かない)
+def update_graph(nodes: list, step: int, time: int, cnt: int, fig, ax, is_fixed_axis = False, is_save = False,
+                 max_fps: float = None) -> None:
+  renderer = renderers.get(ax)
+  if renderer is None: renderer = renderers[ax] = GraphRenderer(fig, ax)
+
+  now = ti.perf_counter()
+  if max_fps and not is_save and now - renderer.last_drawn < 1 / max_fps: return
+  renderer.last_drawn = now
+  renderer.update(nodes, step, time, cnt, is_fixed_axis)
+
+  # グラフの保存(描画済みの画素を複製して書き出しスレッドへ渡す)
+  if is_save:
+    if writer is None: open_writer()
+    writer.write(step, np.asarray(fig.canvas.buffer_rgba()).copy())
+
+  if pf.enabled: pf.lap(pf.RENDER, now)   # 描画と画素の受け渡しの時間
+  return
+
+# フレーム書き出しの開始
+# 保存する図は別スレッドで画像ファイル(または動画ファイル)に書き出す
+# (引数) 画像ファイルの保存先ディレクトリ, 動画ファイル名(None: 画像ファイルで保存), 動画のフレームレート[fps]
+def open_writer(directory: str = FIGURE_DIR, video_file: str = None, fps: float = 10) -> None:
+  global writer
+  import frame_mod as fr
+  close_writer()
+  writer = fr.FrameWriter(directory, video_file, fps)
+  return
+
+# フレーム書き出しの終了(待ちフレームをすべて書き出すまで待つ)
+def close_writer() -> None:
+  global writer
+  if writer is None: return
+  closing, writer = writer, None
+  closing.close()
+  return
+
+# 閉じ忘れたときも終了時に待ちフレームを書き出す
+atexit.register(close_writer)
+
+
+if __name__ == "__main__":
+  pass
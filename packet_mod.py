@@ -0,0 +1,41 @@
+#################### packet_mod.py ####################
+# Packet type for LPWA network simulation
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############# ####################
+
+import json
+from typing import NamedTuple
+
+
+##################################### パケットクラス #####################################
+# パケットの内容は送信ノードが作成したものを全受信ノードで共有する(変更不可)．
+# RSSIは受信ノードごとに異なるため，パケットには含めず受信ノード側で別に保持する．
+# JSON形式への変換は受信・送信パケットの表示時のみ行う．
+#
+# (1) Helloパケット:  Packet(1, clock, my_id, uplink_id, my_depth)
+# (2) Byeパケット:    Packet(2, clock, my_id)
+# (3) Aloneパケット:  Packet(3, clock, my_id)
+class Packet(NamedTuple):
+  type: int               # パケットの種類
+  clock: int              # 論理時計
+  my_id: int              # 送信ノードID
+  uplink_id: int = None   # 送信ノードの親ノードID(Helloパケットのみ)
+  my_depth: int = None    # 送信ノードの深さ(Helloパケットのみ)
+
+  # JSON形式への変換(表示用)
+  # (引数)    RSSI(受信パケットのときのみ付加)
+  # (戻り値)  JSON文字列
+  def to_json(self, rssi: float = None) -> str:
+    items = {"type": self.type, "clock": self.clock, "my_id": self.my_id}
+    if self.type == 1:
+      items["uplink_id"] = self.uplink_id
+      items["my_depth"] = self.my_depth
+    if rssi is not None: items["rssi"] = rssi
+    return json.dumps(items)
+
+################################### パケットクラス終 ###################################
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,81 @@
+#################### profile_mod.py ####################
+# Per-phase profiling counters for LPWA network simulation
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############## ####################
+
+import sys
+import time as ti
+
+################################### 計測区間 ###################################
+# 1ステップ(RootNode.update_network)の処理と描画を区間に分け，区間ごとに経過時間と呼び出し回数を累積する．
+# 呼び出し側は `if pf.enabled:` で判定してから時刻を取得するため，
+# 計測しないときの処理はモジュール変数の判定のみとなる．
+SEARCH    = 0   # 送信待ちノードの探索(ノードリストの同期，送信待ち・送信休止の判定，時間のスキップ)
+SELECT    = 1   # 送信ノードの選択(抽選木の重みの総和と抽選)
+BROADCAST = 2   # ブロードキャスト(受信ノードの探索とRSSIの付与)
+COLLISION = 3   # 経過時間の計算(送信履歴 sent_nodes_history との衝突判定)
+UPDATE    = 4   # 受信ノードの更新(受信パケットの確認，経路の更新，送信パケットの作成)
+RENDER    = 5   # グラフの描画(network_plot.py - update_graph)
+
+PHASE_NAMES = ("search", "select", "broadcast", "collision", "update", "render")
+
+enabled = False                     # 計測の有無
+seconds = [0.0] * len(PHASE_NAMES)  # 区間ごとの累積経過時間[s]
+calls = [0] * len(PHASE_NAMES)      # 区間ごとの呼び出し回数
+################################################################################
+
+
+# 計測の開始
+def enable() -> None:
+  global enabled
+  enabled = True
+  return
+
+# 計測の終了(累積値は保持)
+def disable() -> None:
+  global enabled
+  enabled = False
+  return
+
+# 累積値の初期化
+def reset() -> None:
+  for phase in range(len(PHASE_NAMES)):
+    seconds[phase] = 0.0
+    calls[phase] = 0
+  return
+
+# 現在時刻(区間の開始時刻)
+now = ti.perf_counter
+
+# 区間の終了
+# (引数)    区間, 区間の開始時刻
+# (戻り値)  現在時刻(次の区間の開始時刻)
+def lap(phase: int, start: float) -> float:
+  end = ti.perf_counter()
+  seconds[phase] += end - start
+  calls[phase] += 1
+  return end
+
+# 区間ごとの累積値
+# (戻り値) {区間名: {"seconds": 累積経過時間[s], "calls": 呼び出し回数}, ...} (区間の順)
+def get_counters() -> dict:
+  return {name: {"seconds": seconds[phase], "calls": calls[phase]} for phase, name in enumerate(PHASE_NAMES)}
+
+# 区間ごとの累積値の出力(呼び出し1回あたりの時間と全区間に占める割合を含む)
+# (引数) 出力先(None: 標準出力)
+def summary(file = None) -> None:
+  file = file or sys.stdout
+  total = sum(seconds)
+  print("[Profile] (total " + format(total, ".3f") + " s)", file=file)
+  print(format("phase", "<10") + format("calls", ">10") + format("total[s]", ">12") + format("mean[us]", ">12") + format("share", ">8"), file=file)
+  for phase, name in enumerate(PHASE_NAMES):
+    mean = seconds[phase] / calls[phase] * 1e6 if calls[phase] else 0.0
+    share = seconds[phase] / total * 100 if total else 0.0
+    print(format(name, "<10") + format(calls[phase], ">10") + format(seconds[phase], ">12.3f")
+          + format(mean, ">12.1f") + format(share, ">7.1f") + "%", file=file)
+  return
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,186 @@
+#################### radio_mod.py ####################
+# Radio propagation models for LPWA network simulation
+# Note: This program needs "numpy" and "settings.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############ ####################
+
+import numpy as np
+import settings as st
+
+# RSSIの丸めの幅(小数点第1位に丸めるため，丸め後に下限値となる余裕は0.05)
+ROUND_MARGIN = 0.05
+
+
+# 電波伝搬モデルは，1つの送信ノードの座標から複数の受信ノードの座標へのRSSI(丸め前)を配列でまとめて計算する．
+# (送信ノードの座標を配列で与えると，送信ノードと受信ノードの組ごとに計算する)
+# モデルを settings.py - RADIO_MODEL に設定すると，周囲ノード表(neighbor_mod.py)の構築に使われ，
+# ブロードキャストの受信判定と経過時間の計算(衝突判定)は従来どおりRSSIの下限値で行われる．
+# 下限値を上回りうる最大の距離(reach)は，近傍ノードの絞り込みと空間格子のセルの大きさに使う．
+#
+# - LogDistance:  対数距離モデル RSSI = M - 10*N*log_10(距離) (既定値は settings.py の係数M, N)
+# - Shadowing:    対数正規シャドウイング(リンクごとに固定の正規乱数 x 標準偏差を加算)
+# - Terrain:      地形・遮蔽物の減衰マップ(リンク上の減衰率[dB/km]の平均 x 距離を減算)
+#
+# Shadowing と Terrain は他のモデルを包んで重ねられる(例: Terrain(Shadowing(LogDistance(3.0), 6.0), grid))．
+# RSSIはリンクの向きによらず同じ値になる(周囲ノード表は双方向で同じRSSIを使う)．
+
+
+################################### 対数距離モデルクラス ###################################
+class LogDistance:
+
+  # (引数) 距離減衰係数N(None: settings.py の値), 距離1[km]のRSSI M(None: settings.py の値)
+  def __init__(self, exponent: float = None, ref_rssi: float = None) -> None:
+    self.exponent = exponent  # 距離減衰係数
+    self.ref_rssi = ref_rssi  # 距離1[km]のRSSI
+    return
+
+  def __repr__(self) -> str:
+    return "LogDistance(exponent=" + repr(self.exponent) + ", ref_rssi=" + repr(self.ref_rssi) + ")"
+
+  # 係数 (M, N)
+  def coefficients(self) -> tuple:
+    m = st.M if self.ref_rssi is None else self.ref_rssi
+    n = st.N if self.exponent is None else self.exponent
+    return m, n
+
+  # RSSI算出(丸め前．距離0のときは inf)
+  # (引数)    送信ノードの座標(または K x 2 の配列), 受信ノードの座標の配列(K x 2)
+  # (戻り値)  RSSIの配列(K)
+  def calc_rssi(self, pos, positions) -> np.ndarray:
+    m, n = self.coefficients()
+    d = np.sqrt(((positions - pos) ** 2).sum(axis=1))
+    with np.errstate(divide="ignore"):
+      return m - 10 * n * np.log10(d)
+
+  # RSSIが指定値以上となりうる最大の距離
+  # (引数) RSSI
+  def reach(self, rssi: float) -> float:
+    m, n = self.coefficients()
+    return 10 ** ((m - rssi) / (10 * n))
+
+################################# 対数距離モデルクラス終 #################################
+
+
+################################### シャドウイングクラス ###################################
+# リンクごとの正規乱数は，両端の座標と乱数シードのハッシュ値から求める(同じ配置とシードでは常に同じ値)．
+# 通信可能範囲を有限にするため，正規乱数は ±max_sigmas 倍の標準偏差で打ち切る．
+class Shadowing:
+
+  # (引数) 元のモデル, 標準偏差[dB], 乱数シード, 打ち切る標準偏差の倍数
+  def __init__(self, model, sigma: float, seed: int = 0, max_sigmas: float = 3.0) -> None:
+    self.model = model            # 元のモデル
+    self.sigma = sigma            # 標準偏差
+    self.seed = seed              # 乱数シード
+    self.max_sigmas = max_sigmas  # 打ち切る標準偏差の倍数
+    return
+
+  def __repr__(self) -> str:
+    return ("Shadowing(" + repr(self.model) + ", sigma=" + repr(self.sigma) + ", seed=" + repr(self.seed)
+            + ", max_sigmas=" + repr(self.max_sigmas) + ")")
+
+  def calc_rssi(self, pos, positions) -> np.ndarray:
+    return self.model.calc_rssi(pos, positions) + self.sigma * self.link_normal(pos, positions)
+
+  def reach(self, rssi: float) -> float:
+    return self.model.reach(rssi - self.max_sigmas * self.sigma)
+
+  # リンクごとの正規乱数(打ち切り済み．両端を入れ替えても同じ値)
+  def link_normal(self, pos, positions) -> np.ndarray:
+    h0 = hash_points(np.broadcast_to(pos, positions.shape), self.seed)
+    h1 = hash_points(positions, self.seed)
+    h = mix((h0 ^ h1) + (h0 + h1) * np.uint64(0x9E3779B97F4A7C15))  # 入れ替えに対して対称な組み合わせ
+    u0 = ((mix(h) >> np.uint64(11)) + np.uint64(1)) * 2.0 ** -53    # (0, 1]
+    u1 = (mix(h + np.uint64(1)) >> np.uint64(11)) * 2.0 ** -53      # [0, 1)
+    z = np.sqrt(-2 * np.log(u0)) * np.cos(2 * np.pi * u1)         # ボックス=ミュラー法
+    return np.clip(z, -self.max_sigmas, self.max_sigmas)
+
+################################# シャドウイングクラス終 #################################
+
+
+################################### 減衰マップクラス ###################################
+# 格子状の減衰率[dB/km]を持つ地図で，リンク上の等間隔の点(samples点)の減衰率の平均に距離を掛けて減衰量とする．
+# 地図の範囲外の減衰率は0とする．減衰量は0以上のため，通信可能範囲は元のモデルより広がらない．
+class Terrain:
+
+  # (引数) 元のモデル, 減衰率の格子(X x Y の配列, 0以上), 格子の原点(左下)の座標, セルの一辺の長さ[km],
+  #        リンク上の標本点数
+  def __init__(self, model, attenuation, origin: tuple = (0.0, 0.0), cell_size: float = 1.0, samples: int = 16) -> None:
+    self.model = model
+    self.attenuation = np.asarray(attenuation, dtype=np.float64)  # 減衰率の格子
+    if (self.attenuation < 0).any(): raise ValueError("Attenuation must be non-negative")
+    self.origin = np.asarray(origin, dtype=np.float64)            # 格子の原点
+    self.cell_size = cell_size                                    # セルの一辺の長さ
+    self.samples = samples                                        # リンク上の標本点数
+    return
+
+  def __repr__(self) -> str:
+    return ("Terrain(" + repr(self.model) + ", attenuation=<" + "x".join(map(str, self.attenuation.shape)) + ">, origin="
+            + repr(tuple(self.origin.tolist())) + ", cell_size=" + repr(self.cell_size) + ", samples=" + repr(self.samples) + ")")
+
+  def calc_rssi(self, pos, positions) -> np.ndarray:
+    return self.model.calc_rssi(pos, positions) - self.calc_loss(pos, positions)
+
+  def reach(self, rssi: float) -> float:
+    return self.model.reach(rssi)
+
+  # リンク上の減衰量[dB]
+  # 標本点はリンクの中点に対して対称にとり，座標の小さい端から求める(両端を入れ替えても同じ値)
+  def calc_loss(self, pos, positions) -> np.ndarray:
+    src = np.broadcast_to(pos, positions.shape)
+    is_swapped = (positions[:, 0] < src[:, 0]) | ((positions[:, 0] == src[:, 0]) & (positions[:, 1] < src[:, 1]))
+    a = np.where(is_swapped[:, None], positions, src)
+    b = np.where(is_swapped[:, None], src, positions)
+    t = (np.arange(self.samples) + 0.5) / self.samples
+    points = a + t[:, None, None] * (b - a)   # (samples x K x 2)
+    cells = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+    width, height = self.attenuation.shape
+    inside = (cells[..., 0] >= 0) & (cells[..., 0] < width) & (cells[..., 1] >= 0) & (cells[..., 1] < height)
+    rates = np.zeros(inside.shape)
+    rates[inside] = self.attenuation[cells[..., 0][inside], cells[..., 1][inside]]
+    return rates.mean(axis=0) * np.sqrt(((b - a) ** 2).sum(axis=1))
+
+################################# 減衰マップクラス終 #################################
+
+
+# 64ビットの混合関数(splitmix64)
+def mix(x) -> np.ndarray:
+  x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+  x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+  return x ^ (x >> np.uint64(31))
+
+# 座標のハッシュ値(1e-6[km]単位に丸めた座標と乱数シードから求める)
+# (引数)    座標の配列(K x 2), 乱数シード
+# (戻り値)  ハッシュ値の配列(K, uint64)
+def hash_points(positions, seed: int) -> np.ndarray:
+  q = np.round(np.asarray(positions, dtype=np.float64) * 1e6).astype(np.int64).view(np.uint64)
+  return mix(mix(q[:, 0] + np.uint64(seed & 0xFFFFFFFFFFFFFFFF)) + q[:, 1])
+
+# 既定のモデル(settings.py の係数による対数距離モデル)
+DEFAULT_MODEL = LogDistance()
+
+# 現在のモデル
+def get_model():
+  return st.RADIO_MODEL if st.RADIO_MODEL is not None else DEFAULT_MODEL
+
+# RSSI算出(1つの送信ノードから複数の受信ノードへ．小数点第1位に丸める)
+# (引数)    送信ノードの座標(または受信ノードごとの送信ノードの座標の配列 K x 2),
+#           受信ノードの座標のリスト(または K x 2 の配列)
+# (戻り値)  RSSIの配列(K)
+def calc_rssis(pos, positions) -> np.ndarray:
+  positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+  rssi = get_model().calc_rssi(np.asarray(pos, dtype=np.float64), positions)
+  is_same = np.isinf(rssi)
+  if is_same.any():
+    print("Warning: RSSI cannot be calculated (Distance = 0).")
+    rssi[is_same] = st.RSSI_UPLIM
+  return np.round(rssi, 1)
+
+# 通信可能距離の上限算出(丸め後にRSSIが下限値以上となりうる最大の距離)
+def calc_max_dist() -> float:
+  if st.RADIO_MODEL is None: return st.calc_max_dist()
+  return st.RADIO_MODEL.reach(st.RSSI_LWLIM - ROUND_MARGIN)
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,88 @@
+#################### runner_mod.py ####################
+# Batch runner for LPWA network simulation
+# Note: This program needs "network_mod.py" and "trace_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############# ####################
+
+import network_mod as nm
+import trace_mod as tr
+
+# パケットの種類の名前(packet_mod.py - Packet の type の順)
+PACKET_TYPES = ("hello", "bye", "alone")
+
+
+#################################### 実行結果クラス ####################################
+# 一括実行の結果(ステップ数, 予想経過時間, 通信回数, パケットの種類ごとの送信数)を保持する．
+# コールバックには実行中の値を入れたものを渡す．
+#
+# - step, time, cnt:  呼び出し側から引き継いだ値を含む累計(main.py などの表示と同じ値)
+# - steps:            この実行で処理したステップ数(update_network の呼び出し回数)
+# - packets:          この実行で送信したパケット数 {"hello": 数, "bye": 数, "alone": 数}
+# - pending, pausing: 送信待ちノード数, 送信休止中ノード数(network_mod.py - progress と同じ値)
+# - is_converged:     更新処理が終了した(送信待ち・送信休止中のノードが無くなった)か
+class RunResult:
+
+  def __init__(self, step: int, time: int, cnt: int) -> None:
+    self.step = step            # ステップ数(累計)
+    self.time = time            # 予想経過時間(累計)
+    self.cnt = cnt              # 通信回数(累計)
+    self.steps = 0              # 実行したステップ数
+    self.packets = dict.fromkeys(PACKET_TYPES, 0)   # 送信したパケット数
+    self.pending = 0            # 送信待ちノード数
+    self.pausing = 0            # 送信休止中ノード数
+    self.is_converged = False   # 更新処理の終了
+    return
+
+  def __repr__(self) -> str:
+    return ("RunResult(step=" + str(self.step) + ", time=" + str(self.time) + ", cnt=" + str(self.cnt)
+            + ", steps=" + str(self.steps) + ", packets=" + str(self.packets)
+            + ", pending=" + str(self.pending) + ", pausing=" + str(self.pausing)
+            + ", is_converged=" + str(self.is_converged) + ")")
+
+################################## 実行結果クラス終 ##################################
+
+
+# 更新処理が終了するまで(または上限まで)ネットワークを更新
+# (引数)    ネットワーク(またはノードリスト), 開始時のステップ数・予想経過時間・通信回数,
+#           最大ステップ数(None: 無制限), 予想経過時間の上限(None: 無制限. 上限以上になったら終了),
+#           コールバック(実行結果を引数として every ステップごとに呼び出す. None: 呼び出さない)
+# (戻り値)  実行結果
+def run_until_converged(nodes, step: int = 0, time: int = 0, cnt: int = 0,
+                        max_steps: int = None, max_time: int = None,
+                        callback = None, every: int = 1) -> RunResult:
+  result = RunResult(step, time, cnt)
+  root = nm.search_root_node(nodes)
+  update_network = root.update_network
+  counts = nm.packet_counts
+  start_counts = counts[:]
+  next_callback = every
+
+  res = 0
+  steps = 0
+  while max_steps is None or steps < max_steps:
+    steps += 1
+    if tr.enabled >= tr.PACKET: tr.log(tr.PACKET, "\n========================= Step: " + str(step + steps) + " =========================")
+    res, time, cnt = update_network(nodes, time, cnt)
+    if res == -1: break
+    if max_time is not None and time >= max_time: break
+    if callback is not None and steps >= next_callback:
+      next_callback += every
+      fill_result(result, step + steps, time, cnt, steps, counts, start_counts)
+      callback(result)
+
+  fill_result(result, step + steps, time, cnt, steps, counts, start_counts)
+  result.is_converged = (res == -1)
+  return result
+
+# 実行結果の更新
+def fill_result(result: RunResult, step: int, time: int, cnt: int, steps: int, counts: list, start_counts: list) -> None:
+  result.step, result.time, result.cnt, result.steps = step, time, cnt, steps
+  for k, name in enumerate(PACKET_TYPES):
+    result.packets[name] = counts[k + 1] - start_counts[k + 1]
+  result.pending, result.pausing = nm.scheduler.progress()
+  return
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,259 @@
+#################### scheduler_mod.py ####################
+# Event scheduler for LPWA network simulation
+# Note: This program needs "settings.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ################ ####################
+
+import heapq
+import settings as st
+
+
+################################### 重み付き抽選クラス ###################################
+# フェニック木(Binary Indexed Tree)によりノード番号順の重みの累積和を管理し，
+# 重みの更新と重み付き抽選をO(log N)で行う．
+# 送信できるノードの重み(送信待ち時間)は，時間経過により一斉に同じだけ増加するため，
+# 重み = 定数部 + 内部経過時間 として，定数部の和と要素数の2本の木で管理する．
+# 抽選は random.choices(ノードリスト, 重み) と同じく，累積和が乱数を超える最初のノードを選ぶ．
+class FenwickSampler:
+
+  # (引数) ノード数
+  def __init__(self, size: int = 0) -> None:
+    self.size = 0           # 木の大きさ
+    self.values = []        # 各ノードの重みの定数部(非所属のときはNone)
+    self.sums = [0]         # 定数部の和の木(1始まり)
+    self.counts = [0]       # 要素数の木(1始まり)
+    self.total_value = 0    # 定数部の総和
+    self.total_count = 0    # 要素数の総和
+    self.resize(size)
+    return
+
+  # 木の拡張(要素を保ったまま作り直す)
+  # (引数) ノード数
+  def resize(self, size: int) -> None:
+    if size <= self.size: return
+    size = max(size, 2 * self.size)   # ノード追加のたびに作り直さないように倍々で拡張
+    self.values += [None] * (size - self.size)
+    self.size = size
+    self.sums = [0] * (size + 1)
+    self.counts = [0] * (size + 1)
+    for i, value in enumerate(self.values):
+      if value is None: continue
+      self.sums[i + 1] += value
+      self.counts[i + 1] += 1
+    for i in range(1, size + 1):      # 線形時間での木の構築
+      parent = i + (i & -i)
+      if parent <= size:
+        self.sums[parent] += self.sums[i]
+        self.counts[parent] += self.counts[i]
+    return
+
+  # 木の更新
+  def add(self, index: int, value: int, count: int) -> None:
+    self.total_value += value
+    self.total_count += count
+    i = index + 1
+    while i <= self.size:
+      self.sums[i] += value
+      self.counts[i] += count
+      i += i & -i
+    return
+
+  # 要素の追加・更新
+  # (引数) ノード番号, 重みの定数部
+  def set(self, index: int, value: int) -> None:
+    old = self.values[index]
+    if old == value: return
+    if old is None: self.add(index, value, 1)
+    else: self.add(index, value - old, 0)
+    self.values[index] = value
+    return
+
+  # 要素の削除
+  # (引数) ノード番号
+  def discard(self, index: int) -> None:
+    old = self.values[index]
+    if old is None: return
+    self.add(index, -old, -1)
+    self.values[index] = None
+    return
+
+  # 重みの総和
+  # (引数) 重みの可変部(内部経過時間)
+  def total(self, offset: int) -> int:
+    return self.total_value + offset * self.total_count
+
+  # 重み付き抽選
+  # (引数)    抽選値(0以上重みの総和未満), 重みの可変部(内部経過時間)
+  # (戻り値)  累積和が抽選値を超える最初のノード番号
+  def find(self, x: float, offset: int) -> int:
+    index, acc = 0, 0
+    step = 1 << self.size.bit_length()
+    while step:
+      i = index + step
+      if i <= self.size:
+        weight = self.sums[i] + offset * self.counts[i]
+        if acc + weight <= x:   # 累積和(整数)の比較は random.choices と同様に厳密に行う
+          index = i
+          acc += weight
+      step >>= 1
+    if index >= self.size:      # 丸め誤差で総和に達したときは最後の要素
+      index = self.find(self.total(offset) - 1, offset)
+    return index
+
+################################# 重み付き抽選クラス終 #################################
+
+
+################################### スケジューラクラス ###################################
+# ネットワーク更新処理で毎ステップ全ノードを走査しないように，以下を管理する．
+#
+# - 内部経過時間 elapsed:        送信時間 SENDING_TIME の加算の累計(予想経過時間 time と異なり初期化しない)
+#                                各ノードの送信待ち時間と送信経過時間は，最後に設定した値と
+#                                そのときの内部経過時間から遅延評価する(全ノードへの加算が不要)
+# - 送信待ちノード集合 pending:  正常かつ送信パケットを持つノード
+# - 送信休止中ノードのキュー:    送信可能となる時刻(内部経過時間)をキーとする優先度付きキュー
+#                                (送信経過時間の再設定や故障で古くなった要素は取り出すときに破棄)
+# - 送信休止中ノード pausing:    正常かつ送信休止中のノードと送信可能となる時刻
+#                                状態変数と送信経過時間の変更，送信休止の終了時に更新し，
+#                                処理の終了判定(送信待ち・送信休止中のノード数)をO(1)で行う
+# - 送信ノードの抽選木 sampler:  送信できる(正常かつ送信待ちかつ送信可能な)ノードの重み(送信待ち時間)
+#                                状態変数，送信パケット，送信待ち時間，送信経過時間の変更と
+#                                送信休止の終了時に該当ノードのみ更新する
+#
+# 時間の進め方(1回の呼び出しで1ノードの送信を処理するステップ単位の進行)は従来通りで，
+# 予想経過時間 time と通信回数 cnt は全ノード走査の実装と一致する．
+class Scheduler:
+
+  def __init__(self) -> None:
+    self.nodes = None       # 管理対象のノードリスト
+    self.elapsed = 0        # 内部経過時間[ms]
+    self.pending = set()    # 送信待ちノード集合
+    self.ready_queue = []   # 送信休止中ノードのキュー [(送信可能時刻, 登録順, ノード), ...]
+    self.pausing = {}       # 送信休止中ノード(ノード: 送信可能時刻)
+    self.seq = 0            # 登録順(同時刻の要素の比較用)
+    self.sampler = FenwickSampler()   # 送信ノードの抽選木
+    return
+
+  # ノードリストとの同期
+  # ノードリストが変わったときは送信待ちノード集合，キュー，抽選木を作り直す
+  # ノードが追加されたときは追加分のみ登録
+  # (引数) ノードリスト(ノード番号は周囲ノード表で設定済みであること)
+  def sync(self, nodes: list) -> None:
+    if nodes is self.nodes:
+      if len(nodes) > self.sampler.size: self.sampler.resize(len(nodes))
+      return
+    self.nodes = nodes
+    # 配列から読み込んだネットワークの未作成のノードは初期状態(送信パケット無し・送信可能)のため登録不要
+    created = nodes.created_nodes() if hasattr(nodes, "created_nodes") else nodes
+    self.pending = {node for node in created if node.is_alive and node.sending_pkt}
+    self.ready_queue = []
+    self.pausing = {}
+    self.sampler = FenwickSampler(len(nodes))
+    for node in created:
+      self.push_pausing(node)
+      self.refresh(node)
+    return
+
+  # 管理対象のノードか判定(他のノードリストのノードは無視)
+  def is_tracked(self, node) -> bool:
+    return (
+      self.nodes is not None and node.index is not None
+      and node.index < len(self.nodes) and self.nodes[node.index] is node
+      )
+
+  # ノードの削除
+  # 末尾のノードを削除位置へ移して詰める(ネットワーククラスのノード削除と同じ移動)
+  # (引数) 削除するノード, 削除するノード番号, 末尾のノード番号
+  def remove(self, node, index: int, last: int) -> None:
+    self.pending.discard(node)
+    value = self.sampler.values[last]
+    self.sampler.discard(last)
+    self.sampler.discard(index)
+    if index != last and value is not None: self.sampler.set(index, value)
+    return
+
+  # 抽選木の該当ノードの更新
+  # (引数) ノード
+  def refresh(self, node) -> None:
+    if not self.is_tracked(node): return
+    if node.index >= self.sampler.size: self.sampler.resize(len(self.nodes))
+    if node in self.pending and node.pause_time >= st.SENDING_INTERVAL:
+      self.sampler.set(node.index, node.waiting_time - self.elapsed)
+    else:
+      self.sampler.discard(node.index)
+    return
+
+  # 送信待ちノード集合の更新
+  # (引数) ノード, 送信待ち状態(正常かつ送信パケットあり)
+  def update_pending(self, node, is_pending: bool) -> None:
+    if is_pending: self.pending.add(node)
+    else: self.pending.discard(node)
+    self.refresh(node)
+    return
+
+  # 送信休止中ノードの登録
+  # (引数) ノード
+  def push_pausing(self, node) -> None:
+    if not node.is_alive:
+      self.pausing.pop(node, None)
+      return
+    ready_time = node.ready_time()
+    if ready_time <= self.elapsed:          # 送信可能なノードは登録しない
+      self.pausing.pop(node, None)
+      return
+    self.pausing[node] = ready_time
+    heapq.heappush(self.ready_queue, (ready_time, self.seq, node))
+    self.seq += 1
+    return
+
+  # 送信休止中ノードの存在判定
+  # (戻り値) True: 送信休止中のノードあり, False: なし
+  def has_pausing(self) -> bool:
+    return bool(self.pausing)
+
+  # 処理の進み具合
+  # (戻り値) (送信待ちノード数, 送信休止中ノード数) (どちらも0のとき更新処理は終了)
+  def progress(self) -> tuple:
+    return len(self.pending), len(self.pausing)
+
+  # 送信休止中ノードの送信休止がすべて終了する時刻
+  def last_ready_time(self) -> int:
+    return max(self.pausing.values(), default=self.elapsed)
+
+  # 送信待ちノードのいずれかが送信可能となる時刻
+  def next_ready_time(self) -> int:
+    return min((node.ready_time() for node in self.pending), default=self.elapsed)
+
+  # 指定時刻までに必要な送信時間の加算回数(1回以上)
+  # (引数) 時刻(内部経過時間)
+  def count_steps(self, ready_time: int) -> int:
+    return max(1, -(-(ready_time - self.elapsed) // st.SENDING_TIME))
+
+  # 送信できる送信待ちノードの重み(送信待ち時間)の総和
+  def total_weight(self) -> int:
+    return self.sampler.total(self.elapsed)
+
+  # 送信ノードの重み付き抽選
+  # random.choices(ノードリスト, 重み)と同じ乱数の使い方で，同じ分布(同じ乱数なら同じノード)から選ぶ
+  # (引数)    乱数(0以上1未満)
+  # (戻り値)  送信ノード
+  def choose(self, r: float):
+    return self.nodes[self.sampler.find(r * self.total_weight(), self.elapsed)]
+
+  # 時間の経過
+  # 正常ノードの送信経過時間と送信待ちノードの送信待ち時間が一斉に加算される
+  # 送信休止が終了したノードは抽選木に登録
+  # (引数) 経過時間[ms]
+  def advance(self, dt: int) -> None:
+    self.elapsed += dt
+    while self.ready_queue and self.ready_queue[0][0] <= self.elapsed:
+      ready_time, _, node = heapq.heappop(self.ready_queue)
+      if self.pausing.get(node) == ready_time: del self.pausing[node]
+      self.refresh(node)
+    return
+
+################################# スケジューラクラス終 #################################
+
+if __name__ == '__main__':
+  pass
@@ -8,7 +8,8 @@
 import math
 
 ############################### パケットの種類 ##############################
-# プログラムではJSON形式でパケットを伝搬する．
+# プログラムではパケットクラス Packet (packet_mod.py) でパケットを伝搬する．
+# 以下の表記はパケットをJSON形式で表示したときのもの(受信パケットにはRSSI "rssi" が付加される)．
 # パケットの種類"type"ごとに伝搬内容を変える．
 # Helloパケットは深さ depth が上限 DEPTH_LIM を超えたら送信不可とする．
 DEPTH_LIM = 20
@@ -36,7 +37,7 @@ DEPTH_LIM = 20
 # Helloパケットで経路情報を受信したとき，"ルートノードからの深さ depth "と
 # "電波強度 rssi "で優先順位を付け，経路候補表と子ノードリストを更新する．
 # なお，経路候補表には上方向の経路のみを記録する．
-# 構築された経路候補表 candidate_tbl は，以下の通りに並べられる．
+# 構築された経路候補表 candidate_tbl (経路候補表クラス CandidateTable (candidate_mod.py)) は，以下の通りに並べられる．
 # - 親ノードの経路:           経路候補表0番目の要素      candidate_tbl[0]
 # - バックアップノードの経路:  経路候補表0番目以降の要素  candidate_tbl[1:]
 # 親ノードが変更されたとき，Helloパケットを書き換えて中継する．
@@ -97,24 +98,43 @@ SENDING_TIME = 72               # おおよその平均値：帯域幅125kHz, SF
 
 # 送信休止時間(送信時間の10倍が目安送信休止時間)
 SENDING_INTERVAL = 10 * SENDING_TIME
+
+# 送信できるノードがいないときの時間の進め方
+# True:  次にいずれかのノードが送信可能となる時刻まで一度に進める
+# False: 1回の更新処理で送信時間ずつ進める(従来のステップ数の互換モード)
+# どちらの場合も予想経過時間，送信経過時間，送信待ち時間の合計は一致する．
+is_jump_ahead = True
 ##################################################################################
 
 ######################################### 電波強度(RSSI)の算出 #########################################
 AVAILABLE_DIST = 5.0                    # 通信可能距離[km](ES920LR3データシート参照：外付けワイヤーアンテナ装着時)
 RSSI_UPLIM, RSSI_LWLIM = -30.0, -140.0  # RSSI上限/下限値(ES920LR3データシート参照：PER(パケットエラーレート)1%未満時)
+# 電波伝搬モデル(None: 下記の calc_rssi の対数距離モデル．radio_mod.py 参照)
+# 例: radio_mod.Shadowing(radio_mod.LogDistance(exponent=3.0), sigma=6.0, seed=1)
+RADIO_MODEL = None
 
 # 以下の連立方程式を整理:
 # 上限値(距離0.0001のとき):         RSSI_UPLIM = M - 10*N*log_10(0.0001)
 # 下限値(距離AVAILABLE_DISTのとき): RSSI_LWLIM = M - 10*N*log_10(AVAILABLE_DIST)
 
-M = (10*math.log10(AVAILABLE_DIST)*RSSI_UPLIM + 40*RSSI_LWLIM) / (40 + 10*math.log10(AVAILABLE_DIST))
-N = (RSSI_UPLIM-RSSI_LWLIM) / (40 + 10*math.log10(AVAILABLE_DIST))
+def calc_coefficients(available_dist: float, rssi_uplim: float, rssi_lwlim: float) -> tuple:
+  m = (10*math.log10(available_dist)*rssi_uplim + 40*rssi_lwlim) / (40 + 10*math.log10(available_dist))
+  n = (rssi_uplim-rssi_lwlim) / (40 + 10*math.log10(available_dist))
+  return m, n
+
+M, N = calc_coefficients(AVAILABLE_DIST, RSSI_UPLIM, RSSI_LWLIM)
 
 # 距離算出
 def calc_dist(pos0: tuple, pos1: tuple) -> float:
   return  math.sqrt((pos0[0] - pos1[0])**2 + (pos0[1] - pos1[1])**2)
 
+# 通信可能距離の上限算出
+# RSSIは小数点第1位に丸めるため，丸め後に下限値となる最大の距離を求める(空間索引のセルの大きさに使用)
+def calc_max_dist() -> float:
+  return 10 ** ((M - RSSI_LWLIM + 0.05) / (10 * N))
+
 # RSSI算出(フリスの伝達公式)
+# (既定のモデルの1組分の計算．周囲ノード表は radio_mod.py - calc_rssis で送信ノードごとに一括計算する)
 def calc_rssi(pos0: tuple, pos1: tuple) -> float:
   d = calc_dist(pos0, pos1)
   if d == 0:
@@ -122,10 +142,60 @@ def calc_rssi(pos0: tuple, pos1: tuple) -> float:
     return RSSI_UPLIM
   return  round(M - 10 * N * math.log10(d), 1)
 
+# 通信可能範囲に影響する現在の設定値(周囲ノード表の再構築の判定に使用)
+def geometry_key() -> tuple:
+  return (AVAILABLE_DIST, RSSI_UPLIM, RSSI_LWLIM, RADIO_MODEL)
+
 # (参考)
 # https://techweb.rohm.co.jp/product/wireless/wireless-communication/wireless-communication-basic/1582/
 # https://zenn.dev/yukichi_tech/articles/1539483ed67180
 #######################################################################################################
 
+############################################ 設定値の切り替え ############################################
+# シミュレーションごとの設定値を設定クラス Config にまとめ，apply_config でこのモジュールの設定値に反映する．
+# 各モジュールは実行時に st.設定値 を参照するため，反映後に作成・更新したノードから新しい設定値で動作する．
+# (パラメータスイープや並列実行の子プロセスへの設定値の受け渡しに使用)
+CONFIG_PARAMS = (
+  "DEPTH_LIM", "SENDING_TIME", "SENDING_INTERVAL", "is_jump_ahead",
+  "AVAILABLE_DIST", "RSSI_UPLIM", "RSSI_LWLIM", "RADIO_MODEL", "is_previous_rouing",
+  )
+
+class Config:
+
+  # 指定しない設定値は現在の設定値とする
+  # 送信時間のみ指定したときは，送信休止時間を送信時間の10倍とする
+  def __init__(self, **params) -> None:
+    if "SENDING_TIME" in params and "SENDING_INTERVAL" not in params:
+      params["SENDING_INTERVAL"] = 10 * params["SENDING_TIME"]
+    for name in CONFIG_PARAMS:
+      setattr(self, name, params.pop(name, globals()[name]))
+    if params: raise TypeError("Unknown setting(s): " + ", ".join(params))
+    return
+
+  # 通信可能範囲に影響する設定値(同じ値の設定どうしは周囲ノード表を共有できる)
+  def geometry_key(self) -> tuple:
+    return (self.AVAILABLE_DIST, self.RSSI_UPLIM, self.RSSI_LWLIM, self.RADIO_MODEL)
+
+  # 設定値の辞書(結果の出力用)
+  def to_dict(self) -> dict:
+    return {name: getattr(self, name) for name in CONFIG_PARAMS}
+
+  def __repr__(self) -> str:
+    return "Config(" + ", ".join(name + "=" + repr(value) for name, value in self.to_dict().items()) + ")"
+
+# 現在の設定値の取得
+def get_config() -> Config:
+  return Config()
+
+# 設定値の反映(係数M, Nも再計算)
+# (引数) 設定
+def apply_config(config: Config) -> None:
+  global M, N
+  for name in CONFIG_PARAMS:
+    globals()[name] = getattr(config, name)
+  M, N = calc_coefficients(AVAILABLE_DIST, RSSI_UPLIM, RSSI_LWLIM)
+  return
+#######################################################################################################
+
 if __name__ == '__main__':
   pass
\ No newline at end of file
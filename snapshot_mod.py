@@ -0,0 +1,148 @@
+#################### snapshot_mod.py ####################
+# Network state snapshot for LPWA network simulation
+# Note: This program needs "numpy", "settings.py", and "network_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############### ####################
+
+import numpy as np
+import settings as st
+import network_mod as nm
+
+# IDが無いこと(None)を表す値(経路の親ノードIDの保存に使用)
+NONE_ID = np.iinfo(np.int64).min
+
+
+################################### スナップショットクラス ###################################
+# ネットワークの全状態を配列で保持する(ノードオブジェクトを複製しない)．
+# 収束したネットワークのスナップショットを1つ取り，各試行はそこから復元して分岐することで，
+# 試行ごとのネットワーク構築と初期化を省略できる．
+# 配列のみで構成されるため，並列実行の子プロセスへもそのまま受け渡せる．
+#
+# - ノードごとの値:     状態変数, 論理時計, 送信待ち時間, 送信経過時間(設定時の値と内部経過時間)
+# - 経路候補表:         全ノードの経路を順位の順に連結した列(CSR形式: tbl_indptr で各ノードの範囲を表す)
+# - 子ノードリスト:     全ノードの子ノードIDを連結した列(CSR形式: dn_indptr)
+# - パケット:           送信・受信パケットを持つノードのみ(収束時は空)
+# - 送信済みノード履歴: ノード番号の列
+#
+# 配列から読み込んだネットワーク(network_mod.py - Network.load)は作成済みのノードのみ保存する．
+class Snapshot:
+
+  def __init__(self) -> None:
+    self.size = 0             # ノード数
+    self.elapsed = 0          # スケジューラの内部経過時間
+    self.indices = None       # 保存したノードのノード番号
+    self.alive = None         # 状態変数
+    self.clock = None         # 論理時計
+    self.times = None         # (送信待ち時間, 設定時の内部経過時間, 送信経過時間, 設定時の内部経過時間) x ノード
+    self.tbl_indptr = None    # 経路候補表の範囲
+    self.tbl_routes = None    # 経路 (候補ノードID, 親ノードID, 深さ, 追加番号) x 経路
+    self.tbl_rssi = None      # 経路のRSSI
+    self.tbl_seq = None       # 経路候補表の次の追加番号
+    self.dn_indptr = None     # 子ノードリストの範囲
+    self.dn_ids = None        # 子ノードID
+    self.packets = {}         # ノード番号: (送信パケット, 受信パケット, 受信パケットのRSSI)
+    self.history = None       # 送信済みノード履歴(ノード番号)
+    return
+
+################################# スナップショットクラス終 #################################
+
+
+# スナップショットの作成
+# (引数)    ネットワーク(またはノードリスト)
+# (戻り値)  スナップショット
+def take_snapshot(nodes) -> Snapshot:
+  created = nodes.created_nodes() if isinstance(nodes, nm.Network) else list(nodes)
+  snapshot = Snapshot()
+  snapshot.size = len(nodes)
+  snapshot.elapsed = nm.scheduler.elapsed
+  snapshot.indices = np.array([node.index for node in created], dtype=np.int64)
+  snapshot.alive = np.array([node._is_alive for node in created], dtype=bool)
+  snapshot.clock = np.array([node.clock for node in created], dtype=np.int64)
+  snapshot.times = np.array(
+    [(node._waiting_time, node._waiting_mark, node._pause_time, node._pause_mark) for node in created],
+    dtype=np.int64
+    ).reshape(-1, 4)
+
+  routes, seqs, tbl_lens, dn_ids, dn_lens = [], [], [], [], []
+  for node in created:
+    table_routes, table_seq = node.candidate_tbl.export()
+    routes += table_routes
+    seqs.append(table_seq)
+    tbl_lens.append(len(table_routes))
+    dn_ids += node.dnlink_ids
+    dn_lens.append(len(node.dnlink_ids))
+    if node._sending_pkt or node.received_pkt:
+      snapshot.packets[node.index] = (node._sending_pkt, node.received_pkt, node.received_rssi)
+
+  snapshot.tbl_indptr = np.concatenate([[0], np.cumsum(tbl_lens, dtype=np.int64)])
+  snapshot.tbl_routes = np.array([
+    (route["candidate_id"], NONE_ID if route["uplink_id"] is None else route["uplink_id"], route["depth"], seq)
+    for route, seq in routes
+    ], dtype=np.int64).reshape(-1, 4)
+  snapshot.tbl_rssi = np.array([route["rssi"] for route, _ in routes], dtype=np.float64)
+  snapshot.tbl_seq = np.array(seqs, dtype=np.int64)
+  snapshot.dn_indptr = np.concatenate([[0], np.cumsum(dn_lens, dtype=np.int64)])
+  snapshot.dn_ids = np.array(dn_ids, dtype=np.int64)
+  snapshot.history = np.array([node.index for node in nm.sent_nodes_history], dtype=np.int64)
+  return snapshot
+
+# スナップショットからの復元
+# ノードオブジェクトはそのまま使い，値のみを書き戻す(スケジューラは復元後の値から作り直す)
+# スナップショットの作成後に作成したノードは初期状態に戻す
+# (引数) ネットワーク(またはノードリスト, スナップショットを作成したときと同じノード構成), スナップショット
+def restore_snapshot(nodes, snapshot: Snapshot) -> None:
+  if len(nodes) != snapshot.size: raise ValueError("Snapshot does not match the network (size)")
+  nm.scheduler.nodes = None   # 復元後に作り直す
+  nm.scheduler.elapsed = snapshot.elapsed
+
+  saved = set(snapshot.indices.tolist())
+  created = nodes.created_nodes() if isinstance(nodes, nm.Network) else nodes
+  for node in created:
+    if node.index in saved: continue
+    alive = True
+    if isinstance(nodes, nm.Network) and nodes.source is not None and nodes.source.alive is not None:
+      alive = bool(nodes.source.alive[node.index])
+    restore_node(node, alive, 0, (0, snapshot.elapsed, st.SENDING_INTERVAL, snapshot.elapsed), None, [], [], 0, ())
+
+  indices = snapshot.indices.tolist()
+  alive, clock, times = snapshot.alive.tolist(), snapshot.clock.tolist(), snapshot.times.tolist()
+  tbl_indptr, tbl_routes, tbl_rssi = snapshot.tbl_indptr.tolist(), snapshot.tbl_routes.tolist(), snapshot.tbl_rssi.tolist()
+  tbl_seq, dn_indptr, dn_ids = snapshot.tbl_seq.tolist(), snapshot.dn_indptr.tolist(), snapshot.dn_ids.tolist()
+  for k, index in enumerate(indices):
+    start, end = tbl_indptr[k], tbl_indptr[k + 1]
+    restore_node(
+      nodes[index], alive[k], clock[k], times[k], snapshot.packets.get(index),
+      tbl_routes[start:end], tbl_rssi[start:end], tbl_seq[k], dn_ids[dn_indptr[k]:dn_indptr[k + 1]]
+      )
+
+  if nm.neighbor_tbl.nodes is nodes: nm.neighbor_tbl.receivers.clear()  # 状態変数が変わるため受信ノード一覧を破棄
+  nm.sync_nodes(nodes)
+  nm.sent_nodes_history[:] = [nodes[index] for index in snapshot.history.tolist()]
+  nm.received_nodes[:] = [nodes[index] for index, (_, received_pkt, _) in snapshot.packets.items() if received_pkt]
+  return
+
+# ノードの値の書き戻し(スケジューラへの通知は行わない)
+# (引数) ノード, 状態変数, 論理時計, 送信待ち時間・送信経過時間, パケット,
+#        経路 [(候補ノードID, 親ノードID, 深さ, 追加番号), ...], 経路のRSSI, 次の追加番号, 子ノードID
+def restore_node(node, alive: bool, clock: int, times: tuple, packets: tuple,
+                 routes: list, rssis: list, seq: int, dn_ids) -> None:
+  node._is_alive = alive
+  node.clock = clock
+  node._waiting_time, node._waiting_mark, node._pause_time, node._pause_mark = times
+  node._sending_pkt, node.received_pkt, node.received_rssi = packets or (None, None, None)
+  node.candidate_tbl.restore([
+    ({
+      "candidate_id": candidate_id,
+      "uplink_id"   : None if uplink_id == NONE_ID else uplink_id,
+      "depth"       : depth,
+      "rssi"        : rssi
+      }, route_seq)
+    for (candidate_id, uplink_id, depth, route_seq), rssi in zip(routes, rssis)
+    ], seq)
+  node.dnlink_ids = set(dn_ids)
+  return
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,98 @@
+#################### spatial_mod.py ####################
+# Spatial index for LPWA network simulation
+# Note: This program needs "numpy"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############## ####################
+
+import math
+import numpy as np
+
+
+################################### 空間格子クラス ###################################
+# 平面を通信可能距離を一辺とする正方形のセルに区切り，セルごとにノード番号を保持する．
+# ある座標から通信可能距離内にあるノードは，その座標を含むセルと周囲8セルのいずれかに必ず含まれるため，
+# 全ノードとの距離を計算せずに受信候補ノードを絞り込める．
+# (セル数はノードが存在するセルの分だけ辞書で保持する)
+class SpatialGrid:
+
+  # (引数) セルの一辺の長さ(通信可能距離以上とする)
+  def __init__(self, cell_size: float) -> None:
+    self.cell_size = cell_size  # セルの一辺の長さ
+    self.cells = {}             # セル座標: ノード番号の集合
+    return
+
+  # 座標を含むセルの座標
+  def cell_of(self, pos: tuple) -> tuple:
+    return (math.floor(pos[0] / self.cell_size), math.floor(pos[1] / self.cell_size))
+
+  # ノードの追加
+  # (引数) ノード番号, 座標
+  def insert(self, index: int, pos: tuple) -> None:
+    self.cells.setdefault(self.cell_of(pos), set()).add(index)
+    return
+
+  # ノードの削除
+  # (引数) ノード番号, 座標(追加時の座標)
+  def remove(self, index: int, pos: tuple) -> None:
+    cell = self.cell_of(pos)
+    indices = self.cells.get(cell)
+    if indices is None: return
+    indices.discard(index)
+    if not indices: del self.cells[cell]  # 空になったセルは削除
+    return
+
+  # 受信候補ノードの探索
+  # (引数)    座標
+  # (戻り値)  座標を含むセルと周囲8セルにあるノード番号
+  def query(self, pos: tuple):
+    cx, cy = self.cell_of(pos)
+    for dx in (-1, 0, 1):
+      for dy in (-1, 0, 1):
+        indices = self.cells.get((cx + dx, cy + dy))
+        if indices: yield from indices
+
+################################# 空間格子クラス終 #################################
+
+
+# 近傍ノードの組の一括探索
+# 空間格子と同じセル分けで，各ノードの周囲9セルにあるノードとの距離を配列演算でまとめて計算する
+# (引数)    座標の配列(N x 2), セルの一辺の長さ, 距離の上限
+# (戻り値)  距離が上限以下のノード番号の組(CSR形式) (indptr, indices)
+#           ノードiの近傍ノード番号は indices[indptr[i]:indptr[i+1]] (昇順)
+def find_pairs(positions, cell_size: float, max_dist: float) -> tuple:
+  pos = np.asarray(positions, dtype=np.float64)
+  n = len(pos)
+  if n == 0: return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+  cells = np.floor(pos / cell_size).astype(np.int64)
+  cells -= cells.min(axis=0) - 1          # 周囲のセルも含めて非負にする
+  width = int(cells[:, 1].max()) + 2
+  keys = cells[:, 0] * width + cells[:, 1]
+  order = np.argsort(keys, kind="stable")   # セル順のノード番号
+  sorted_keys = keys[order]
+
+  rows, cols = [], []
+  for dx in (-1, 0, 1):
+    for dy in (-1, 0, 1):
+      target = sorted_keys + dx * width + dy  # セル順に探索(探索値が昇順のため高速)
+      lo = np.searchsorted(sorted_keys, target, "left")
+      counts = np.searchsorted(sorted_keys, target, "right") - lo
+      total = int(counts.sum())
+      if total == 0: continue
+      i = np.repeat(order, counts)
+      j = order[np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(total)]
+      d2 = ((pos[i] - pos[j]) ** 2).sum(axis=1)
+      keep = (i != j) & (d2 <= max_dist * max_dist)
+      rows.append(i[keep])
+      cols.append(j[keep])
+
+  i = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+  j = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+  order = np.lexsort((j, i))
+  indptr = np.zeros(n + 1, dtype=np.int64)
+  np.cumsum(np.bincount(i, minlength=n), out=indptr[1:])
+  return indptr, j[order]
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,88 @@
+#################### sweep_mod.py ####################
+# Parameter sweep for LPWA network simulation
+# Note: This program needs "settings.py", "network_mod.py", "trial_mod.py", and "topology_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############ ####################
+
+import os
+import csv
+import itertools
+import concurrent.futures
+import settings as st
+import network_mod as nm
+import trial_mod as tl
+import topology_mod as tp
+
+# 結果CSVファイルの列
+SWEEP_HEADER = ["size"] + list(st.CONFIG_PARAMS) + ["trial"] + tl.RESULT_HEADER
+
+
+# 設定の格子の作成
+# (引数)    設定値ごとの候補 {設定値の名前: [値, ...], ...}
+# (戻り値)  すべての組み合わせの設定のリスト
+def make_grid(params: dict) -> list:
+  names = list(params)
+  return [st.Config(**dict(zip(names, values))) for values in itertools.product(*params.values())]
+
+# 通信可能範囲が同じ設定の組ごとの試行(並列実行用)
+# 同じネットワークを初期化して使い回し，周囲ノード表を設定間・試行間で共有する
+# (引数)    (ノード数, トポロジー, [(設定番号, 設定), ...], [(試行番号, 乱数シード), ...])
+# (戻り値)  [(ノード数, 設定番号, 試行番号, ave_depth, ave_rssi, time, cnt), ...]
+def run_group(args: tuple) -> list:
+  size, topology, configs, trials = args
+  nodes = None
+  rows = []
+  for config_index, config in configs:
+    st.apply_config(config)
+    if nodes is None: nodes = tl.make_nodes(topology)
+    for trial, seed in trials:
+      nm.reset_nodes(nodes)
+      rows.append((size, config_index, trial) + tl.run_trial_on(nodes, seed))
+  return rows
+
+# パラメータスイープ
+# ノード数ごとに通信可能範囲が同じ設定をまとめ，試行をプロセス数に分割して並列に実行する
+# 各試行の乱数シードはすべての設定・ノード数で共通(設定間の比較のばらつきを抑える)
+# (引数)    設定のリスト, ノード数のリスト, 試行回数, マスターシード, 最大プロセス数(None: CPUコア数),
+#           配置方法の名前(topology_mod.py - LAYOUTS)
+# (戻り値)  結果の行のリスト(ノード数, 設定, 試行の順)
+def run_sweep(configs: list, sizes: list, num_of_trial: int, master_seed: int = 0, max_workers: int = None, layout: str = "uniform") -> list:
+  max_workers = max_workers or os.cpu_count()
+  trials = list(enumerate(tl.make_seeds(num_of_trial, master_seed)))
+  num_of_chunk = min(max_workers, num_of_trial)
+
+  jobs = []
+  for size in sizes:
+    topology = tp.make_topology(layout, size, master_seed * 1000003 + size)
+    groups = {}   # 通信可能範囲に影響する設定値: [(設定番号, 設定), ...]
+    for config_index, config in enumerate(configs):
+      groups.setdefault(config.geometry_key(), []).append((config_index, config))
+    for group in groups.values():
+      for i in range(num_of_chunk):
+        jobs.append((size, topology, group, trials[i::num_of_chunk]))
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    rows = [row for rows in executor.map(run_group, jobs) for row in rows]
+  rows.sort(key=lambda row: (sizes.index(row[0]), row[1], row[2]))
+  return [
+    [size] + list(configs[config_index].to_dict().values()) + [trial] + list(result)
+    for size, config_index, trial, *result in rows
+    ]
+
+# 結果のCSVファイル出力
+# (引数) ファイル名, 結果の行のリスト
+def save_sweep(filename: str, rows: list) -> None:
+  with open(filename, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(SWEEP_HEADER)
+    writer.writerows(rows)
+  return
+
+# 実行例: 送信時間と経路制御アルゴリズムの組み合わせをノード数ごとに比較
+if __name__ == '__main__':
+  configs = make_grid({"SENDING_TIME": [52, 72], "is_previous_rouing": [False, True]})
+  rows = run_sweep(configs, sizes=[61, 200], num_of_trial=10)
+  save_sweep("Experiment/result_sweep.csv", rows)
+  print("Saved the result.")
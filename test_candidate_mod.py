@@ -0,0 +1,114 @@
+#################### test_candidate_mod.py ####################
+# Tests of the routing candidate table for LPWA network simulation
+# Note: This program needs "network_mod.py" and "candidate_mod.py"
+#       (Run with "python -m pytest" or "python -m unittest")
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### #################### ####################
+
+import random
+import unittest
+import network_mod as nm
+import candidate_mod as cd
+
+
+################################### リストの経路候補表クラス ###################################
+# 従来の線形探索による経路候補表(比較用．経路制御アルゴリズムは従来の Node.update_route と同じ)
+class ListCandidateTable:
+
+  def __init__(self) -> None:
+    self.candidate_tbl = []
+    return
+
+  def search_route(self, id: int) -> int:
+    for i, route in enumerate(self.candidate_tbl):
+      if int(id) == int(route["candidate_id"]): return i
+    return -1
+
+  def remove_route(self, id: int) -> int:
+    for i, route in enumerate(self.candidate_tbl):
+      if int(id) == int(route["candidate_id"]):
+        del self.candidate_tbl[i]
+        return int(i == 0)
+    return -1
+
+  def update_route(self, new_route: dict) -> int:
+    if self.candidate_tbl == []:
+      self.candidate_tbl.append(new_route)
+      return 1
+    else:
+      res = (self.remove_route(new_route["candidate_id"]) == 1)
+      for i, route in enumerate(self.candidate_tbl):
+        if new_route["depth"] < route["depth"]:
+          self.candidate_tbl.insert(i, new_route)
+          return int(res or int(i == 0))
+        elif new_route["depth"] == route["depth"] and new_route["rssi"] > route["rssi"]:
+          self.candidate_tbl.insert(i, new_route)
+          return int(res or int(i == 0))
+      self.candidate_tbl.append(new_route)
+      return int(res) if res else -1
+
+################################# リストの経路候補表クラス終 #################################
+
+
+class CandidateTableTest(unittest.TestCase):
+
+  # 経路の作成
+  def make_route(self, candidate_id: int, depth: int, rssi: float) -> dict:
+    return {"candidate_id": candidate_id, "uplink_id": 0, "depth": depth, "rssi": rssi}
+
+  # 従来の経路候補表と経路候補表クラスの比較(並び順，親ノード，探索結果)
+  def check(self, expected: ListCandidateTable, node: nm.Node) -> None:
+    self.assertIsInstance(node.candidate_tbl, cd.CandidateTable)
+    self.assertEqual(node.candidate_tbl[:], expected.candidate_tbl)
+    self.assertEqual(list(node.candidate_tbl), expected.candidate_tbl)
+    self.assertEqual(len(node.candidate_tbl), len(expected.candidate_tbl))
+    expected_uplink = expected.candidate_tbl[0]["candidate_id"] if expected.candidate_tbl else None
+    self.assertEqual(node.uplink_id(), expected_uplink)
+    for route in expected.candidate_tbl:
+      self.assertEqual(node.search_route(route["candidate_id"]), expected.search_route(route["candidate_id"]))
+
+  # 同じ経路の挿入・更新・削除の列を両方に適用し，戻り値と経路候補表を比較
+  # (引数) 乱数シード, 操作回数, 候補ノードIDの数, 深さの数, RSSIの候補
+  def run_sequence(self, seed: int, steps: int, ids: int, depths: int, rssis: list) -> None:
+    rng = random.Random(seed)
+    expected, node = ListCandidateTable(), nm.Node(1, (0, 0))
+    for _ in range(steps):
+      op = rng.random()
+      id = rng.randrange(ids)
+      if op < 0.3:
+        self.assertEqual(node.remove_route(id), expected.remove_route(id), "remove " + str(id))
+      elif op < 0.32:
+        node.candidate_tbl.clear()
+        expected.candidate_tbl.clear()
+      else:
+        route = self.make_route(id, rng.randrange(depths), rng.choice(rssis))
+        self.assertEqual(node.update_route(dict(route)), expected.update_route(dict(route)), "update " + repr(route))
+      self.check(expected, node)
+      self.assertEqual(node.search_route(ids), -1)
+
+  # RSSIと深さの同じ経路が多いとき(同順位の並び順)
+  def test_equal_rssi_and_depth(self):
+    for seed in range(20):
+      self.run_sequence(seed, 300, 6, 2, [-90.0, -100.0])
+
+  def test_random_routes(self):
+    for seed in range(20):
+      self.run_sequence(seed, 500, 30, 6, [round(-60 - 0.5 * k, 1) for k in range(80)])
+
+  # 同順位の経路は追加した順に並び，更新した経路は同順位の経路の後ろへ移る
+  def test_update_moves_behind_equal_routes(self):
+    expected, node = ListCandidateTable(), nm.Node(1, (0, 0))
+    for id in (5, 3, 4):
+      route = self.make_route(id, 1, -90.0)
+      self.assertEqual(node.update_route(dict(route)), expected.update_route(dict(route)))
+    self.assertEqual([route["candidate_id"] for route in node.candidate_tbl], [5, 3, 4])
+
+    route = self.make_route(5, 1, -90.0)  # 親ノードの経路を同じ値で更新
+    self.assertEqual(node.update_route(dict(route)), expected.update_route(dict(route)))
+    self.assertEqual([route["candidate_id"] for route in node.candidate_tbl], [3, 4, 5])
+    self.check(expected, node)
+
+if __name__ == '__main__':
+  unittest.main()
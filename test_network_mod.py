@@ -0,0 +1,44 @@
+#################### test_network_mod.py ####################
+# Tests of the network update for LPWA network simulation
+# Note: This program needs "network_mod.py", "runner_mod.py", and "trace_mod.py"
+#       (Run with "python -m pytest" or "python -m unittest")
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ################### ####################
+
+import random
+import unittest
+import network_mod as nm
+import runner_mod as rn
+import trace_mod as tr
+
+
+class DisableTest(unittest.TestCase):
+
+  def setUp(self):
+    tr.set_level(0)
+
+  # ネットワーク構築(収束まで更新)
+  def build(self, positions: list) -> nm.Network:
+    nodes = nm.Network([nm.RootNode(0, positions[0])] + [nm.Node(i, pos) for i, pos in enumerate(positions[1:], 1)])
+    random.seed(1)
+    nodes.root.build_network()
+    rn.run_until_converged(nodes)
+    return nodes
+
+  def candidate_ids(self, node) -> list:
+    return [route["candidate_id"] for route in node.candidate_tbl]
+
+  # 移動したノードは移動前の周囲ノードの経路を持ち続け，移動前の周囲ノードの故障時に削除される
+  def test_moved_node_drops_route_of_old_neighbor(self):
+    nodes = self.build([(0, 0), (3, 0), (6, 0), (3, 3), (20, 0)])
+    moved = nodes.get(3)
+    self.assertEqual(self.candidate_ids(moved), [0, 1, 2])
+
+    moved.move((30, 30))
+    nodes.get(1).disable(nodes)
+    self.assertEqual(self.candidate_ids(moved), [0, 2])
+
+if __name__ == '__main__':
+  unittest.main()
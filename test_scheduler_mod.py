@@ -0,0 +1,118 @@
+#################### test_scheduler_mod.py ####################
+# Tests of the weighted sampler for LPWA network simulation
+# Note: This program needs "scheduler_mod.py"
+#       (Run with "python -m pytest" or "python -m unittest")
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### #################### ####################
+
+import bisect
+import itertools
+import random
+import unittest
+import scheduler_mod as sc
+
+# 抽選値の乱数の上限(1未満の最大の浮動小数点数)
+R_MAX = 1 - 2 ** -53
+
+
+class FenwickSamplerTest(unittest.TestCase):
+
+  # 累積和の二分探索による抽選(random.choices と同じ選び方)
+  # (引数)    各ノードの重みの定数部(非所属のときはNone), 抽選値, 重みの可変部
+  # (戻り値)  ノード番号
+  def reference(self, values: list, x: float, offset: int) -> int:
+    members = [i for i, value in enumerate(values) if value is not None]
+    cum_weights = list(itertools.accumulate(values[i] + offset for i in members))
+    return members[bisect.bisect(cum_weights, x, 0, len(members) - 1)]
+
+  # 抽選木と累積和の二分探索の比較
+  # 乱数による抽選値に加えて，累積和の境界(累積和ちょうどとその直前)の抽選値も比較
+  def check(self, sampler: sc.FenwickSampler, values: list, offset: int, rng: random.Random) -> None:
+    weights = [value + offset for value in values if value is not None]
+    total = sampler.total(offset)
+    self.assertEqual(total, sum(weights))
+    if total <= 0: return
+    xs = [r * total for r in [0.0, R_MAX] + [rng.random() for _ in range(50)]]
+    xs += [x for cum in itertools.accumulate(weights) for x in (cum - 1, cum) if 0 <= x < total]
+    for x in xs:
+      self.assertEqual(sampler.find(x, offset), self.reference(values, x, offset), "x = " + str(x))
+
+  # ランダムな重みの抽選木の作成
+  # (引数)    ノード数, 重みの可変部, 重みが0の割合, 非所属の割合, 乱数生成器
+  # (戻り値)  抽選木, 各ノードの重みの定数部
+  def make_sampler(self, size: int, offset: int, zero_rate: float, none_rate: float, rng: random.Random) -> tuple:
+    sampler = sc.FenwickSampler(size)
+    values = [None] * sampler.size
+    for i in range(size):
+      if rng.random() < none_rate: continue
+      weight = 0 if rng.random() < zero_rate else rng.randint(1, 2000)
+      values[i] = weight - offset
+      sampler.set(i, values[i])
+    return sampler, values
+
+  def test_random_weights(self):
+    rng = random.Random(1)
+    for size in (1, 2, 3, 7, 8, 9, 100, 1000):
+      sampler, values = self.make_sampler(size, 0, 0.0, 0.2, rng)
+      self.check(sampler, values, 0, rng)
+
+  def test_zero_weights(self):
+    rng = random.Random(2)
+    for size in (2, 16, 100):
+      sampler, values = self.make_sampler(size, 0, 0.5, 0.1, rng)
+      self.check(sampler, values, 0, rng)
+    # 先頭と末尾の重みが0
+    sampler, values = sc.FenwickSampler(5), [0, 3, 0, 4, 0, None, None, None]
+    for i, value in enumerate(values[:5]): sampler.set(i, value)
+    self.check(sampler, values, 0, rng)
+
+  # 重みの可変部(内部経過時間)が0でないとき(定数部は負となりうる)
+  def test_offset(self):
+    rng = random.Random(3)
+    for offset in (1, 300, 123456):
+      sampler, values = self.make_sampler(200, offset, 0.2, 0.2, rng)
+      self.check(sampler, values, offset, rng)
+      # 時間の経過(定数部はそのままで全要素の重みが増える)
+      self.check(sampler, values, offset + 300, rng)
+
+  # 要素の追加・更新・削除と木の拡張を繰り返したとき
+  def test_set_discard_resize_sequence(self):
+    rng = random.Random(4)
+    sampler = sc.FenwickSampler(4)
+    values = [None] * sampler.size
+    offset = 0
+    for step in range(2000):
+      op = rng.random()
+      if op < 0.05 and sampler.size < 500:   # 拡張は倍々のため大きさを抑える
+        sampler.resize(sampler.size + rng.randint(1, 10))
+        values += [None] * (sampler.size - len(values))
+      elif op < 0.35:
+        i = rng.randrange(sampler.size)
+        sampler.discard(i)
+        values[i] = None
+      elif op < 0.45:
+        offset += 300
+      else:
+        i = rng.randrange(sampler.size)
+        values[i] = rng.choice([0, rng.randint(1, 2000)]) - offset
+        sampler.set(i, values[i])
+      self.assertEqual(len(values), sampler.size)
+      if step % 10 == 0: self.check(sampler, values, offset, rng)
+    self.check(sampler, values, offset, rng)
+
+  # 同じ乱数なら random.choices と同じノードを選ぶ
+  def test_same_choice_as_random_choices(self):
+    rng = random.Random(5)
+    sampler, values = self.make_sampler(300, 600, 0.1, 0.3, rng)
+    members = [i for i, value in enumerate(values) if value is not None]
+    weights = [values[i] + 600 for i in members]
+    for seed in range(200):
+      random.seed(seed)
+      expected = random.choices(members, weights)[0]
+      random.seed(seed)
+      self.assertEqual(sampler.find(random.random() * sampler.total(600), 600), expected)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,40 @@
+#################### test_tree_mod.py ####################
+# Tests of the analytic routing tree for LPWA network simulation
+# Note: This program needs "network_mod.py", "trial_mod.py", "topology_mod.py", and "tree_mod.py"
+#       (Run with "python -m pytest" or "python -m unittest")
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ################ ####################
+
+import unittest
+import network_mod as nm
+import trial_mod as tl
+import topology_mod as tp
+import tree_mod as tb
+
+
+class ValidateTest(unittest.TestCase):
+
+  # 解析的に構築したネットワーク(ノード番号順に作成したリストのネットワーク)
+  def make_tree(self) -> nm.Network:
+    nodes = tl.make_nodes(tp.uniform(100, 1).to_list())
+    tb.warm_start(nodes)
+    return nodes
+
+  def test_converged_tree(self):
+    self.assertEqual(tb.validate(self.make_tree()), [])
+
+  # 以前の親ノードに古い子ノードIDが残ったまま，子ノードを持つノードを削除
+  def test_removed_parent_with_stale_child_id(self):
+    nodes = self.make_tree()
+    parent = next(node for node in nodes[1:] if node.dnlink_ids)
+    old_parent = next(node for node in nodes[1:] if node is not parent and node.id != parent.uplink_id())
+    old_parent.dnlink_ids.add(parent.id)  # 経路の切り替えを通知されなかった以前の親ノード
+    nodes.remove(parent.id)
+
+    errors = tb.validate(nodes)
+    self.assertIn("Node " + str(old_parent.id) + ": unknown child " + str(parent.id), errors)
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,246 @@
+#################### topology_mod.py ####################
+# Synthetic topology generator and topology files for LPWA network simulation
+# Note: This program needs "numpy" and "network_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############### ####################
+
+import math
+import numpy as np
+import network_mod as nm
+
+# ノード密度[ノード数/km^2](main.py, experiment.py のトポロジーと同程度: 61ノード / 30km四方)
+NODE_DENSITY = 61 / (30 * 30)
+
+# 都市型配置の区域 ((ノード数の割合, ノード密度の倍率), ...) (中心から順に 市街地, 郊外, 農村部)
+URBAN_ZONES = ((0.4, 4.0), (0.4, 1.0), (0.2, 0.25))
+
+# トポロジーファイル(.npy)のレコード形式(固定長: ID, 座標, 状態変数)
+# メモリマップで開くと，各列はファイル上のレコードを直接参照し，参照したノードのページのみ読み込まれる
+RECORD_DTYPE = np.dtype([("id", "<i8"), ("pos", "<f8", (2,)), ("alive", "?")])
+
+
+#################################### トポロジークラス ####################################
+# ノードのID・座標・状態変数を配列で保持する(ノードオブジェクトは作成しない)．
+# 先頭(ID: 0)をルートノードとし，原点に置く．
+# ネットワーク(network_mod.py - Network)へは配列のまま渡し，ノードは参照されたときに作成される．
+class Topology:
+
+  # (引数) IDの配列(N), 座標の配列(N x 2), 状態変数の配列(N, None: 全て正常)
+  def __init__(self, ids, positions, alive = None) -> None:
+    self.ids = ids              # ノードID
+    self.positions = positions  # 座標[km]
+    self.alive = alive          # 状態変数(True: 正常, False: 故障)
+    return
+
+  def __len__(self) -> int:
+    return len(self.ids)
+
+  # ネットワークの作成(ノードは参照されたときに作成)
+  def to_network(self) -> nm.Network:
+    network = nm.Network()
+    network.load(self)
+    return network
+
+  # トポロジーのリスト [(ID, 座標), ...] (trial_mod.py の形式)
+  def to_list(self) -> list:
+    return [(id, tuple(pos)) for id, pos in zip(self.ids.tolist(), self.positions.tolist())]
+
+  # トポロジーファイルの保存
+  # レコードはファイルへ直接書き込む(全ノード分のレコードをメモリ上に作らない)
+  # (引数) ファイル名(.npy)
+  def save(self, filename: str) -> None:
+    records = np.lib.format.open_memmap(filename, mode="w+", dtype=RECORD_DTYPE, shape=(len(self),))
+    records["id"] = self.ids
+    records["pos"] = self.positions
+    records["alive"] = True if self.alive is None else self.alive
+    records.flush()
+    del records
+    return
+
+################################## トポロジークラス終 ##################################
+
+
+# トポロジーファイルの読み込み
+# (引数)    ファイル名(.npy), メモリマップの有無(True: 参照したノードのページのみ読み込む, False: 全て読み込む)
+# (戻り値)  トポロジー
+def load_topology(filename: str, mmap: bool = True) -> Topology:
+  records = np.load(filename, mmap_mode="r" if mmap else None)
+  if records.dtype != RECORD_DTYPE: raise ValueError("Unknown topology file format: " + str(records.dtype))
+  return Topology(records["id"], records["pos"], records["alive"])
+
+# ネットワークのトポロジーの取得
+# 配列から読み込んだネットワークの未作成のノードは配列の値をそのまま使い，作成済みのノードのみ参照する
+# (引数)    ネットワーク(ルートノードを先頭にする)
+# (戻り値)  トポロジー
+def from_network(network: nm.Network) -> Topology:
+  size = len(network)
+  ids = np.empty(size, dtype=np.int64)
+  positions = np.empty((size, 2))
+  alive = np.ones(size, dtype=bool)
+  source = network.source
+  if source is not None:
+    num = min(size, len(source))    # 未作成のノードは配列と位置が一致している
+    ids[:num] = source.ids[:num]
+    positions[:num] = source.positions[:num]
+    if source.alive is not None: alive[:num] = source.alive[:num]
+  for node in network.created_nodes():
+    ids[node.index] = node.id
+    positions[node.index] = node.pos
+    alive[node.index] = node.is_alive
+  root = network.root.index
+  for column in (ids, positions, alive):   # ルートノードを先頭へ
+    column[[0, root]] = column[[root, 0]]
+  return Topology(ids, positions, alive)
+
+# ネットワークの保存
+# (引数) ファイル名(.npy), ネットワーク
+def save_network(filename: str, network: nm.Network) -> None:
+  from_network(network).save(filename)
+  return
+
+# ネットワークの読み込み
+# ノードは参照されたときにファイルの該当レコードから作成する
+# (引数)    ファイル名(.npy), メモリマップの有無
+# (戻り値)  ネットワーク
+def load_network(filename: str, mmap: bool = True) -> nm.Network:
+  return load_topology(filename, mmap).to_network()
+
+# ルートノードを加えたトポロジーの作成
+# (引数)    ルートノード以外の座標の配列((N-1) x 2)
+# (戻り値)  トポロジー(ID: 0 ~ N-1)
+def with_root(positions) -> Topology:
+  positions = np.vstack([np.zeros((1, 2)), positions])
+  return Topology(np.arange(len(positions), dtype=np.int64), positions)
+
+# ノード数とノード密度から配置範囲(正方形)の一辺の半分を算出
+def calc_half_width(size: int, density: float) -> float:
+  return math.sqrt(size / density) / 2
+
+# 一様ランダム配置
+# ノード密度が一定となる正方形の範囲に一様に配置する
+# (引数)    ノード数(ルートノードを含む), 乱数シード, ノード密度
+# (戻り値)  トポロジー
+def uniform(size: int, seed: int, density: float = NODE_DENSITY) -> Topology:
+  rng = np.random.default_rng(seed)
+  half = calc_half_width(size, density)
+  return with_root(rng.uniform(-half, half, (size - 1, 2)))
+
+# ポアソンディスク配置
+# どの2ノードも最小距離以上離れるように一様に配置する(候補点を一括生成して棄却する逐次追加法)
+# 候補点は一辺 最小距離/√2 のセル(1セルに高々1ノード)で管理し，周囲5x5セルのノードとの距離のみ判定する
+# (引数)    ノード数(ルートノードを含む), 乱数シード, ノード密度, 最小距離[km](None: ノード間隔の0.6倍)
+# (戻り値)  トポロジー
+def poisson_disk(size: int, seed: int, density: float = NODE_DENSITY, min_dist: float = None) -> Topology:
+  rng = np.random.default_rng(seed)
+  half = calc_half_width(size, density)
+  min_dist = min_dist or 0.6 / math.sqrt(density)
+  cell_size = min_dist / math.sqrt(2)
+  width = int(math.ceil(2 * half / cell_size)) + 1
+  cells = np.full((width, width), -1, dtype=np.int64)   # セルにあるノード番号(-1: 空き)
+  batch = np.full((width, width), -1, dtype=np.int64)   # セルにある同じ回の候補点の番号(-1: 空き)
+  points = np.zeros((size, 2))                          # 先頭はルートノード(原点)
+  cells[int(half // cell_size), int(half // cell_size)] = 0
+  count, tries = 1, 0
+
+  while count < size:
+    cand = rng.uniform(-half, half, (max(1024, 2 * (size - count)), 2))
+    cx, cy = ((cand + half) // cell_size).astype(np.int64).T
+    keep = cells[cx, cy] < 0
+    cand, cx, cy = cand[keep], cx[keep], cy[keep]
+    _, first = np.unique(cx * width + cy, return_index=True)    # 同じセルの候補点は最初のもののみ
+    first.sort()
+    cand, cx, cy = cand[first], cx[first], cy[first]
+    batch[cx, cy] = np.arange(len(cand))
+
+    keep = np.ones(len(cand), dtype=bool)
+    for dx in range(-2, 3):
+      for dy in range(-2, 3):
+        if dx == 0 and dy == 0: continue
+        nx, ny = cx + dx, cy + dy
+        inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < width)
+        nx, ny = np.where(inside, nx, 0), np.where(inside, ny, 0)
+        j = np.where(inside, cells[nx, ny], -1)   # 配置済みのノード
+        near = (j >= 0) & (((points[np.maximum(j, 0)] - cand) ** 2).sum(axis=1) < min_dist ** 2)
+        k = np.where(inside, batch[nx, ny], -1)   # 先に生成した同じ回の候補点
+        near |= (k >= 0) & (k < np.arange(len(cand))) & (((cand[np.maximum(k, 0)] - cand) ** 2).sum(axis=1) < min_dist ** 2)
+        keep &= ~near
+    batch[cx, cy] = -1
+
+    cand, cx, cy = cand[keep][:size - count], cx[keep][:size - count], cy[keep][:size - count]
+    if len(cand) == 0:
+      tries += 1
+      if tries >= 20: raise ValueError("Cannot place " + str(size) + " nodes with min_dist = " + str(min_dist))
+      continue
+    points[count:count + len(cand)] = cand
+    cells[cx, cy] = np.arange(count, count + len(cand))
+    count += len(cand)
+
+  return Topology(np.arange(size, dtype=np.int64), points)
+
+# 格子配置(ゆらぎあり)
+# ノード間隔の正方格子点を原点に近い順に選び，各ノードを一様なゆらぎでずらす(ルートノードは原点のまま)
+# (引数)    ノード数(ルートノードを含む), 乱数シード, ノード密度, ゆらぎの大きさ(ノード間隔に対する割合)
+# (戻り値)  トポロジー
+def grid_jitter(size: int, seed: int, density: float = NODE_DENSITY, jitter: float = 0.3) -> Topology:
+  rng = np.random.default_rng(seed)
+  spacing = 1 / math.sqrt(density)
+  radius = math.ceil(math.sqrt(size)) // 2 + 1
+  axis = np.arange(-radius, radius + 1)
+  lattice = np.stack(np.meshgrid(axis, axis), axis=-1).reshape(-1, 2)
+  order = np.argsort((lattice ** 2).sum(axis=1), kind="stable")
+  points = lattice[order][:size] * spacing
+  points[1:] += rng.uniform(-jitter * spacing, jitter * spacing, (size - 1, 2))
+  return Topology(np.arange(size, dtype=np.int64), points)
+
+# クラスター配置
+# クラスターの中心を一様に配置し，各ノードをいずれかの中心の周りに正規分布で配置する
+# (引数)    ノード数(ルートノードを含む), 乱数シード, ノード密度,
+#           クラスター数(None: 50ノードに1つ), クラスターの広がり(標準偏差)[km](None: 中心の間隔の1/4)
+# (戻り値)  トポロジー
+def clustered(size: int, seed: int, density: float = NODE_DENSITY, num_of_cluster: int = None, spread: float = None) -> Topology:
+  rng = np.random.default_rng(seed)
+  half = calc_half_width(size, density)
+  num_of_cluster = num_of_cluster or max(1, round(size / 50))
+  spread = spread or 0.25 * 2 * half / math.sqrt(num_of_cluster)
+  centers = rng.uniform(-half, half, (num_of_cluster, 2))
+  labels = rng.integers(num_of_cluster, size=size - 1)
+  return with_root(centers[labels] + rng.normal(0, spread, (size - 1, 2)))
+
+# 都市型配置(複数密度)
+# 原点を中心とする同心円状の区域ごとに，区域のノード密度で一様に配置する
+# (引数)    ノード数(ルートノードを含む), 乱数シード, 基準のノード密度, 区域 ((ノード数の割合, ノード密度の倍率), ...)
+# (戻り値)  トポロジー
+def urban(size: int, seed: int, density: float = NODE_DENSITY, zones: tuple = URBAN_ZONES) -> Topology:
+  rng = np.random.default_rng(seed)
+  total = sum(ratio for ratio, _ in zones)
+  counts = [int((size - 1) * ratio / total) for ratio, _ in zones]
+  counts[0] += size - 1 - sum(counts)   # 端数は中心の区域に加える
+  parts, inner = [], 0.0
+  for count, (_, scale) in zip(counts, zones):
+    outer = math.sqrt(inner ** 2 + count / (density * scale) / math.pi)
+    r = np.sqrt(rng.uniform(inner ** 2, outer ** 2, count))
+    theta = rng.uniform(0, 2 * math.pi, count)
+    parts.append(np.stack([r * np.cos(theta), r * np.sin(theta)], axis=1))
+    inner = outer
+  return with_root(np.concatenate(parts))
+
+# 配置方法の一覧(名前で指定するとき)
+LAYOUTS = {
+  "uniform": uniform,
+  "poisson_disk": poisson_disk,
+  "grid_jitter": grid_jitter,
+  "clustered": clustered,
+  "urban": urban,
+  }
+
+# トポロジーの作成
+# (引数)    配置方法の名前, ノード数(ルートノードを含む), 乱数シード, 配置方法ごとの設定値
+# (戻り値)  トポロジー
+def make_topology(layout: str, size: int, seed: int, **options) -> Topology:
+  if size < 1: raise ValueError("Topology needs at least the root node")
+  return LAYOUTS[layout](size, seed, **options)
+
+if __name__ == '__main__':
+  pass
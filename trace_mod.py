@@ -0,0 +1,87 @@
+#################### trace_mod.py ####################
+# Tracing for LPWA network simulation
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############ ####################
+
+import sys
+import collections
+import contextlib
+
+################################### 出力レベル ###################################
+# 出力レベル以下のイベントのみ出力する．
+# 呼び出し側は `if tr.enabled >= レベル:` で判定してから文字列を作成するため，
+# 出力しないときの処理はモジュール変数の比較1回のみとなる．
+SILENT  = 0   # 出力なし
+WARNING = 1   # 警告(深さ上限超過，孤立ノードなど)
+NOTE    = 2   # 処理状況(送信休止中のノードあり，ルートノードの送信など)
+PACKET  = 3   # ステップごとの受信・送信パケット
+
+level = PACKET        # コンソールへの出力レベル
+buffer = None         # 直近のイベントを保持するリングバッファ(None: 保持しない)
+buffer_level = SILENT # リングバッファへの記録レベル
+enabled = PACKET      # コンソール出力またはリングバッファ記録を行う最大レベル
+##################################################################################
+
+
+# 判定用の最大レベルの更新
+def update_enabled() -> None:
+  global enabled
+  enabled = max(level, buffer_level if buffer is not None else SILENT)
+  return
+
+# コンソールへの出力レベルの設定
+# (引数) 出力レベル
+def set_level(lv: int) -> None:
+  global level
+  level = lv
+  update_enabled()
+  return
+
+# リングバッファの開始
+# 不具合の調査用に，コンソールへの出力レベルとは別に直近 size 件のイベントを保持する
+# (引数) 保持するイベント数, 記録レベル
+def open_buffer(size: int, lv: int = PACKET) -> None:
+  global buffer, buffer_level
+  buffer = collections.deque(maxlen=size)
+  buffer_level = lv
+  update_enabled()
+  return
+
+# リングバッファの終了
+def close_buffer() -> None:
+  global buffer, buffer_level
+  buffer = None
+  buffer_level = SILENT
+  update_enabled()
+  return
+
+# イベントの出力
+# (引数) 出力レベル, メッセージ
+def log(lv: int, message: str) -> None:
+  if lv <= level: print(message)
+  if buffer is not None and lv <= buffer_level: buffer.append(message)
+  return
+
+# リングバッファの内容の出力(古い順)
+# (引数) 出力先(None: 標準出力)
+def dump(file = None) -> None:
+  file = file or sys.stdout
+  print("[Trace buffer] (last " + str(len(buffer or ())) + " events)", file=file)
+  for message in buffer or ():
+    print(message, file=file)
+  return
+
+# 一時的にコンソールへの出力を止める(リングバッファへの記録は継続)
+@contextlib.contextmanager
+def quiet():
+  saved_level = level
+  set_level(SILENT)
+  try:
+    yield
+  finally:
+    set_level(saved_level)
+
+if __name__ == '__main__':
+  pass
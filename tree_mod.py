@@ -0,0 +1,173 @@
+#################### tree_mod.py ####################
+# Analytic routing tree builder for LPWA network simulation
+# Note: This program needs "numpy", "settings.py", "network_mod.py", and "snapshot_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ########### ####################
+
+import numpy as np
+import settings as st
+import network_mod as nm
+import snapshot_mod as sn
+
+# 経路の親ノードID(ルートノードの uplink_id() の値)
+ROOT_UPLINK_ID = 0
+
+
+# 提案手法でネットワーク構築が収束したときの状態は，パケットの送受信を模擬しなくても次のように定まる．
+#
+# - ノードの深さ:   ルートノードからの幅優先探索のホップ数(深さが上限に達したノードはHelloパケットを中継しない)
+# - 親ノード:       1つ浅い周囲ノードのうちRSSIが最大のもの
+# - 経路候補表:     Helloパケットを受信できる全ての周囲ノードの経路(自ノードを親とするものを除く)を(深さ, RSSI降順)に並べたもの
+# - 子ノードリスト: 自ノードを親とする周囲ノード
+#
+# 深さとRSSIがともに等しい経路の並び(親ノードを含む)は，模擬では受信順で決まるため，ここではノード番号順とする．
+# 構築した状態はスナップショット(snapshot_mod.py)として返すため，復元すれば構築済みのネットワークとして使える．
+# (現状手法は最初に受信した経路のみを保持し，受信順に依存するため対象外)
+
+
+# ノードの深さの計算(幅優先探索)
+# (引数)    ネットワーク(またはノードリスト)
+# (戻り値)  ノード番号: 深さ (ルートノードから到達できる正常ノードのみ)
+def calc_depths(nodes) -> dict:
+  nm.neighbor_tbl.sync(nodes)
+  root = nm.search_root_node(nodes)
+  depths = {root.index: 0}
+  frontier = [root.index]
+  depth = 0
+  while frontier and depth < st.DEPTH_LIM:  # 深さが上限に達したノードは中継しない
+    depth += 1
+    next_frontier = []
+    for i in frontier:
+      for j in nm.neighbor_tbl.row(i):
+        if j in depths or not nodes[j].is_alive: continue
+        depths[j] = depth
+        next_frontier.append(j)
+    frontier = next_frontier
+  return depths
+
+# 収束状態の構築
+# (引数)    ネットワーク(またはノードリスト)
+# (戻り値)  収束状態のスナップショット(作成済みのノードと到達できるノードを保存)
+def build_tree(nodes) -> sn.Snapshot:
+  if st.is_previous_rouing: raise ValueError("Analytic tree is only defined for the proposed routing")
+  depths = calc_depths(nodes)
+  root = nm.search_root_node(nodes)
+
+  # Helloパケットを送信するノード(ルートノードと深さが上限未満のノード)
+  senders = {i for i, depth in depths.items() if depth < st.DEPTH_LIM or i == root.index}
+
+  # 親ノード(1つ浅い送信ノードのうちRSSI最大，同値はノード番号の小さい方)
+  uplinks = {}
+  for i, depth in depths.items():
+    if i == root.index: continue
+    uplinks[i] = min(
+      (j for j in nm.neighbor_tbl.row(i) if j in senders and depths[j] == depth - 1),
+      key=lambda j: (-nm.neighbor_tbl.row(i)[j], j)
+      )
+  children = {}
+  for i, j in uplinks.items():
+    children.setdefault(j, []).append(i)
+
+  created = nodes.created_nodes() if isinstance(nodes, nm.Network) else list(nodes)
+  indices = sorted(set(node.index for node in created) | set(depths))
+  clock = root.clock + 1 if root.clock % 2 == 0 else root.clock  # ネットワーク構築後の論理時計
+  elapsed = nm.scheduler.elapsed
+
+  snapshot = sn.Snapshot()
+  snapshot.size = len(nodes)
+  snapshot.elapsed = elapsed
+  snapshot.indices = np.array(indices, dtype=np.int64)
+  snapshot.alive = np.array([nodes[i].is_alive for i in indices], dtype=bool)
+  snapshot.clock = np.array([clock if i in depths else 0 for i in indices], dtype=np.int64)
+  snapshot.times = np.array([(0, elapsed, st.SENDING_INTERVAL, elapsed)] * len(indices), dtype=np.int64).reshape(-1, 4)
+
+  routes, rssis, seqs, tbl_lens, dn_ids, dn_lens = [], [], [], [], [], []
+  for i in indices:
+    table = []
+    if i in depths and i != root.index:
+      row = nm.neighbor_tbl.row(i)
+      table = sorted(
+        (j for j in row if j in senders and uplinks.get(j) != i),
+        key=lambda j: (depths[j], -row[j], j)
+        )
+    for seq, j in enumerate(table):
+      uplink_id = ROOT_UPLINK_ID if j == root.index else nodes[uplinks[j]].id
+      routes.append((nodes[j].id, uplink_id, depths[j], seq))
+      rssis.append(nm.neighbor_tbl.row(i)[j])
+    seqs.append(len(table))
+    tbl_lens.append(len(table))
+    child_ids = [nodes[j].id for j in children.get(i, ()) if j in senders]  # 中継しない子ノードは親に知られない
+    dn_ids += child_ids
+    dn_lens.append(len(child_ids))
+
+  snapshot.tbl_indptr = np.concatenate([[0], np.cumsum(tbl_lens, dtype=np.int64)])
+  snapshot.tbl_routes = np.array(routes, dtype=np.int64).reshape(-1, 4)
+  snapshot.tbl_rssi = np.array(rssis, dtype=np.float64)
+  snapshot.tbl_seq = np.array(seqs, dtype=np.int64)
+  snapshot.dn_indptr = np.concatenate([[0], np.cumsum(dn_lens, dtype=np.int64)])
+  snapshot.dn_ids = np.array(dn_ids, dtype=np.int64)
+  snapshot.history = np.zeros(0, dtype=np.int64)
+  return snapshot
+
+# 収束状態からの開始(ネットワーク構築の模擬を省略)
+# (引数) ネットワーク(またはノードリスト)
+def warm_start(nodes) -> None:
+  sn.restore_snapshot(nodes, build_tree(nodes))
+  return
+
+# 模擬で構築したネットワークの検証
+# 深さ，親ノードの経路の(深さ, RSSI)，受信できる周囲ノードの経路(経路候補表と子ノードリストの和)を解析結果と比較し，
+# 子ノードリストが各ノードの親ノードと一致しているかも確認する(同値の経路の並びによる違いは不一致としない)
+# ネットワークに存在しないノード(削除済みなど)を指す子ノードIDや経路も不一致として報告する
+# (引数)    ネットワーク(またはノードリスト, ネットワーク構築が収束していること)
+# (戻り値)  不一致の内容のリスト(一致: 空)
+def validate(nodes) -> list:
+  depths = calc_depths(nodes)
+  root = nm.search_root_node(nodes)
+  senders = {i for i, depth in depths.items() if depth < st.DEPTH_LIM or i == root.index}
+  created = nodes.created_nodes() if isinstance(nodes, nm.Network) else list(nodes)
+  index_of = {node.id: node.index for node in created}
+
+  errors = []
+  for node in created:
+    if not node.is_alive: continue
+    i = node.index
+    row = nm.neighbor_tbl.row(i)
+    children = set()
+    for id in node.dnlink_ids:
+      j = index_of.get(id)
+      if j is None:
+        errors.append("Node " + str(node.id) + ": unknown child " + str(id))
+        continue
+      children.add(j)
+    expected_children = {j for j in row if nodes[j].is_alive and nodes[j].uplink_id() == node.id and j in senders}
+    if children != expected_children:
+      errors.append("Node " + str(node.id) + ": children " + str(sorted(node.dnlink_ids)) + " do not match uplinks")
+    if node is root: continue
+
+    depth = depths.get(i, st.DEPTH_LIM)
+    if node.depth() != depth:
+      errors.append("Node " + str(node.id) + ": depth " + str(node.depth()) + " != " + str(depth))
+      continue
+    if i in depths:
+      rssi = max(row[j] for j in row if j in senders and depths[j] == depth - 1)
+      if node.uplink_rssi() != rssi:
+        errors.append("Node " + str(node.id) + ": uplink RSSI " + str(node.uplink_rssi()) + " != " + str(rssi))
+
+    heard = set()
+    for route in node.candidate_tbl:
+      j = index_of.get(route["candidate_id"])
+      if j is None:
+        errors.append("Node " + str(node.id) + ": unknown route candidate " + str(route["candidate_id"]))
+        continue
+      heard.add((j, route["depth"], route["rssi"]))
+    heard |= {(j, nodes[j].depth(), row[j]) for j in children}
+    expected = {(j, depths[j], row[j]) for j in row if j in senders}
+    if heard != expected:
+      errors.append("Node " + str(node.id) + ": routes " + str(sorted(heard)) + " != " + str(sorted(expected)))
+  return errors
+
+if __name__ == '__main__':
+  pass
@@ -0,0 +1,173 @@
+#################### trial_mod.py ####################
+# Parallel trial runner for LPWA network simulation
+# Note: This program needs "settings.py", "network_mod.py", "trace_mod.py", "topology_mod.py",
+#       "snapshot_mod.py", "tree_mod.py", and "runner_mod.py"
+# @created      2026-10-17
+# @developer    226E0214 Seiya Kinoshita
+# @affiliation  Tanaka Lab. Kyutech
+#################### ############ ####################
+
+import os
+import csv
+import random
+import statistics
+import concurrent.futures
+import settings as st
+import network_mod as nm
+import trace_mod as tr
+import topology_mod as tp
+import snapshot_mod as sn
+import tree_mod as tb
+import runner_mod as rn
+
+# 結果CSVファイルの列
+RESULT_HEADER = ["ave_depth", "ave_rssi", "time", "cnt"]
+
+
+# トポロジーの取得
+# (引数)    ノードリスト
+# (戻り値)  トポロジー [(ID, 座標), ...] (先頭はルートノード)
+def get_topology(nodes: list) -> list:
+  return [(node.id, node.pos) for node in nodes]
+
+# トポロジーからネットワークを作成
+# (引数)    トポロジー [(ID, 座標), ...] (先頭はルートノード)，または配列のトポロジー(topology_mod.py)
+# (戻り値)  ネットワーク
+def make_nodes(topology: list) -> nm.Network:
+  if isinstance(topology, tp.Topology): return topology.to_network()
+  (root_id, root_pos), others = topology[0], topology[1:]
+  return nm.Network([nm.RootNode(root_id, root_pos)] + [nm.Node(id, pos) for id, pos in others])
+
+# 更新処理が終了するまでネットワークを更新
+# (引数)    ネットワーク(またはノードリスト), 予想経過時間, 通信回数
+# (戻り値)  予想経過時間, 通信回数
+def run_network(nodes: list, time: int = 0, cnt: int = 0) -> tuple:
+  result = rn.run_until_converged(nodes, time=time, cnt=cnt)
+  return result.time, result.cnt
+
+# 1回の試行(ネットワーク構築 -> ノード故障 -> ネットワーク再構成)
+# 初期状態のネットワークに対して，シードを設定した乱数系列で試行する
+# (引数)    ネットワーク, 乱数シード
+# (戻り値)  ノード平均深さ, 経路平均RSSI, 復旧経過時間, 復旧通信回数
+def run_trial_on(nodes: nm.Network, seed: int) -> tuple:
+  random.seed(seed)
+  root = nodes.root
+
+  # 試行中は逐次出力しない(リングバッファへの記録は継続)
+  with tr.quiet():
+    # ネットワーク構築
+    root.build_network()
+    run_network(nodes)
+    return run_recovery(nodes)
+
+# 収束したネットワークのノード故障と再構成
+# (引数)    ネットワーク(構築済み)
+# (戻り値)  ノード平均深さ, 経路平均RSSI, 復旧経過時間, 復旧通信回数
+def run_recovery(nodes: nm.Network) -> tuple:
+  ave_depth = statistics.fmean([node.depth() for node in nodes[1:]])
+  ave_rssi = statistics.fmean([node.uplink_rssi() for node in nodes[1:]])
+
+  # ノード故障と再構成
+  unable_node = random.choice(nodes[1:])  # 非ルートノードを1つ選択
+  time, cnt = run_failure(nodes, [unable_node])
+  return ave_depth, ave_rssi, time, cnt
+
+# 収束したネットワークのノード故障(複数可)と再構成
+# (引数)    ネットワーク(構築済み), 故障させるノードのリスト
+# (戻り値)  復旧経過時間, 復旧通信回数
+def run_failure(nodes: nm.Network, unable_nodes: list) -> tuple:
+  root = nodes.root
+
+  # ノード故障(同時に故障したものとして，再構成の前にすべて停止)
+  for unable_node in unable_nodes:
+    unable_node.disable(nodes)
+
+  # ネットワーク再構成
+  # 現状手法
+  if st.is_previous_rouing:
+    root.init_network()
+    run_network(nodes)
+    root.build_network()
+    return run_network(nodes)  # 計測開始
+  # 提案手法
+  return run_network(nodes)    # 計測開始
+
+# 収束状態のスナップショットの作成(分岐する試行の基準)
+# 解析的に構築するときは，ネットワーク構築を模擬せずに収束状態を求める(提案手法のみ, tree_mod.py 参照)
+# (引数)    トポロジー, 乱数シード(ネットワーク構築に使用), 解析的な構築の有無
+# (戻り値)  スナップショット
+def make_baseline(topology, seed: int, is_analytic: bool = False) -> sn.Snapshot:
+  nodes = make_nodes(topology)
+  if is_analytic: return tb.build_tree(nodes)
+  random.seed(seed)
+  with tr.quiet():
+    nodes.root.build_network()
+    run_network(nodes)
+  return sn.take_snapshot(nodes)
+
+# 収束状態から分岐した1回の試行(ノード故障 -> ネットワーク再構成)
+# ネットワーク構築を省略し，スナップショットから復元したネットワークに対してシードを設定した乱数系列で試行する
+# (引数)    ネットワーク, スナップショット, 乱数シード
+# (戻り値)  ノード平均深さ, 経路平均RSSI, 復旧経過時間, 復旧通信回数
+def run_trial_from(nodes: nm.Network, snapshot: sn.Snapshot, seed: int) -> tuple:
+  sn.restore_snapshot(nodes, snapshot)
+  random.seed(seed)
+  with tr.quiet():
+    return run_recovery(nodes)
+
+# 1回の試行(並列実行用)
+# 各試行はトポロジーから作成した独自のネットワークと，シードを設定した乱数系列を使用する
+# (引数)    (トポロジー, 乱数シード, 設定)
+# (戻り値)  ノード平均深さ, 経路平均RSSI, 復旧経過時間, 復旧通信回数
+def run_trial(args: tuple) -> tuple:
+  topology, seed, config = args
+  st.apply_config(config)   # 子プロセスに親プロセスの設定値を反映
+  return run_trial_on(make_nodes(topology), seed)
+
+# 収束状態から分岐した1回の試行(並列実行用)
+# (引数)    (トポロジー, スナップショット, 乱数シード, 設定)
+# (戻り値)  ノード平均深さ, 経路平均RSSI, 復旧経過時間, 復旧通信回数
+def run_forked_trial(args: tuple) -> tuple:
+  topology, snapshot, seed, config = args
+  st.apply_config(config)
+  return run_trial_from(make_nodes(topology), snapshot, seed)
+
+# 試行ごとの乱数シードの生成(マスターシードから再現可能)
+# (引数)    試行回数, マスターシード
+# (戻り値)  乱数シードのリスト
+def make_seeds(num_of_trial: int, master_seed: int) -> list:
+  rng = random.Random(master_seed)
+  return [rng.getrandbits(64) for _ in range(num_of_trial)]
+
+# 反復試行の並列実行
+# 試行はプロセスプールで並列に実行し，結果は試行順に並べる
+# 分岐するときは，マスターシードで1度だけ構築した収束状態から各試行を始める(構築の結果は全試行で共通)
+# 解析的に構築するときは，解析的に求めた収束状態から分岐する
+# (引数)    トポロジー, 試行回数, マスターシード, 最大プロセス数(None: CPUコア数), 収束状態からの分岐の有無,
+#           解析的な構築の有無
+# (戻り値)  試行ごとの結果のリスト [(ave_depth, ave_rssi, time, cnt), ...]
+def run_trials(topology: list, num_of_trial: int, master_seed: int = 0, max_workers: int = None,
+               is_forking: bool = False, is_analytic: bool = False) -> list:
+  config = st.get_config()
+  seeds = make_seeds(num_of_trial, master_seed)
+  if is_forking or is_analytic:
+    snapshot = make_baseline(topology, master_seed, is_analytic)
+    function, args = run_forked_trial, [(topology, snapshot, seed, config) for seed in seeds]
+  else:
+    function, args = run_trial, [(topology, seed, config) for seed in seeds]
+  max_workers = max_workers or os.cpu_count()
+  chunksize = max(1, num_of_trial // (4 * max_workers))
+  with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    return list(executor.map(function, args, chunksize=chunksize))
+
+# 結果のCSVファイル出力
+# (引数) ファイル名, 試行ごとの結果のリスト
+def save_results(filename: str, results: list) -> None:
+  with open(filename, "w", newline="") as f:
+    writer = csv.writer(f)
+    writer.writerow(RESULT_HEADER)
+    writer.writerows(results)
+  return
+
+if __name__ == '__main__':
+  pass